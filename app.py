@@ -1,32 +1,52 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 import cv2
 import numpy as np
 import base64
+import json
+import os
 from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
 from live_class import live_class_bp
-from datetime import datetime, timedelta
 
 # Authentication routes
 from user_interface.auth_routes import auth_bp
 
 # Pose modules
-from backend.predictor import predict_pose
-from backend.pose_estimator import extract_landmarks
-
-# Nutrition module
-from nutrition_guide.nutrition_engine import NutritionEngine
+from backend.predictor import predict_poses, predict_pose_cached, start_model_watcher
+from backend.frame_cache import frame_cache
+from backend.features import landmarks_from_bytes, validate_landmarks, FLAT_DIM
+from backend.pose_workers import extract_frame_landmarks, extract_frames_landmarks
+from backend.pose_session import session_manager, MIN_COMPLEXITY, MAX_COMPLEXITY
+from backend.video_jobs import get_job_manager, DEFAULT_SAMPLE_FPS, MAX_SAMPLE_FPS, DONE, FAILED
+
+# Lazy subsystem loading + readiness
+import multiprocessing
+from readiness import register, start_warmup, readiness
+
+# Metrics + non-blocking logging
+import time
+import telemetry
+from telemetry import STAGE_LATENCY, REQUEST_LATENCY, POSE_FRAMES
 
 # Health analyzers
 from diet_sleep_tracker.diet_analyzer import analyze_diet
 from diet_sleep_tracker.sleep_analyzer import analyze_sleep
 
-# Import users_collection from your database module
-from user_interface.auth_routes import users_collection  # Make sure this path is correct
+# Premium / free-trial checks for the pose endpoints
+from user_interface.entitlements import (
+    entitlement_cache, NOT_FOUND, TRIAL_INFO_MISSING, TRIAL_EXPIRED
+)
+
+telemetry.configure_logging()
 
 app = Flask(__name__)
 CORS(app)
 
+# Backstop body limit for every endpoint; it also bounds chunked bodies, which
+# have no Content-Length. Upload endpoints set their own limit per request.
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_REQUEST_MB", "64")) * 1024 * 1024
+
 # 🔑 Secret for signing JWT (use environment variable in production)
 app.config["JWT_SECRET_KEY"] = "super-secret-key"
 jwt = JWTManager(app)
@@ -37,55 +57,242 @@ app.register_blueprint(auth_bp)
 # Register live class blueprint
 app.register_blueprint(live_class_bp)
 
-nutrition_engine = NutritionEngine()
+
+def _load_nutrition_engine():
+    # Nutrition module (pulls in pandas + CSV/YAML data)
+    from nutrition_guide.nutrition_engine import NutritionEngine
+    return NutritionEngine()
+
+
+nutrition_engine = register("nutrition", _load_nutrition_engine)
+
+# Load heavy subsystems in the background so /login etc. are served immediately
+# (skipped in spawned helper processes, which re-import this module)
+if multiprocessing.parent_process() is None:
+    start_warmup()
+    # Follow the model registry's CURRENT pointer (no-op without POSE_MODEL_REGISTRY)
+    start_model_watcher()
+
+
+# ===== READINESS ENDPOINT =====
+@app.route("/ready", methods=["GET"])
+def ready():
+    """Per-subsystem readiness for load balancers / autoscalers (503 until all are loaded)."""
+    all_ready, subsystems = readiness()
+    return jsonify({"ready": all_ready, "subsystems": subsystems}), 200 if all_ready else 503
+
+
+# ===== METRICS ENDPOINT =====
+telemetry.register_callback("pose_frame_cache_hits_total", "Frames answered from the frame-delta cache",
+                            lambda: frame_cache.hits, kind="counter")
+telemetry.register_callback("pose_frame_cache_misses_total", "Frames that needed a model call",
+                            lambda: frame_cache.misses, kind="counter")
+telemetry.register_callback("entitlement_cache_hits_total", "Access checks answered from the entitlement cache",
+                            lambda: entitlement_cache.hits, kind="counter")
+telemetry.register_callback("entitlement_cache_misses_total", "Access checks that queried the users collection",
+                            lambda: entitlement_cache.misses, kind="counter")
+telemetry.register_callback("pose_sessions_active", "Open live pose sessions",
+                            lambda: len(session_manager))
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_latency(response):
+    start = g.pop("request_start", None)
+    if start is not None:
+        REQUEST_LATENCY.observe(time.perf_counter() - start,
+                                request.endpoint or "unknown", request.method, str(response.status_code))
+    return response
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Latency histograms and counters in the Prometheus text format."""
+    return Response(telemetry.render(), mimetype="text/plain; version=0.0.4")
+
+
+def record_frame(landmarks_flat):
+    """Counts a frame that went through pose estimation, by endpoint and outcome."""
+    POSE_FRAMES.inc(request.endpoint, "no_pose" if landmarks_flat is None else "detected")
 
 
 # ===== YOGA POSE PREDICTION ENDPOINT =====
+# Upper bound on frames accepted by /predict_frames in one request
+MAX_FRAMES_PER_REQUEST = 32
+
+
+def check_pose_access(current_user):
+    """
+    Returns an error response if the user may not use pose prediction, else None.
+    Premium/trial state comes from the entitlement cache: one users lookup per
+    user per ENTITLEMENT_CACHE_TTL instead of one per frame.
+    """
+    with STAGE_LATENCY.time("user_lookup"):
+        access = entitlement_cache.get(current_user).check()
+
+    if access == NOT_FOUND:
+        return jsonify({"error": "User not found"}), 404
+    if access == TRIAL_INFO_MISSING:
+        return jsonify({"error": "User trial info missing"}), 403
+    if access == TRIAL_EXPIRED:
+        # ❌ Trial expired
+        return jsonify({
+            "error": "Trial expired. Please upgrade to premium.",
+            "payment_url": "https://rzp.io/rzp/8jKeOewG"  # 🔗 Placeholder
+        }), 403
+
+    return None
+
+
+def decode_image(data_url):
+    """Decodes a base64 data URL into a BGR frame."""
+    image_data = base64.b64decode(data_url.split(',')[1])
+    return decode_image_bytes(image_data)
+
+
+def decode_image_bytes(buffer):
+    """Decodes encoded image bytes (JPEG/PNG) into a BGR frame without copying them."""
+    image = cv2.imdecode(np.frombuffer(buffer, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Invalid image data")
+    return image
+
+
+# Largest raw/multipart image body accepted by the single-frame endpoints
+MAX_UPLOAD_BYTES = 4 * 1024 * 1024
+
+
+def read_body(limit):
+    """
+    The raw request body, or None if it is larger than limit bytes. Reads at
+    most limit + 1 bytes, so chunked bodies (no Content-Length) are bounded too.
+    """
+    if request.content_length is not None and request.content_length > limit:
+        return None
+    request.max_content_length = limit + 1
+    body = read_exact(request.stream, limit + 1)
+    return None if len(body) > limit else body
+
+
+def read_frame_request():
+    """
+    Reads one frame + pose name from the request in any supported encoding:
+      - application/json: {"image": "<base64 data URL>", "pose_name": ...}
+      - image/jpeg, image/png, application/octet-stream: raw encoded bytes
+      - multipart/form-data: an "image" file part
+    For the binary forms pose_name comes from the X-Pose-Name header, the
+    query string, or (multipart) a form field.
+    Returns (image, pose_name, None) or (None, None, error response).
+    """
+    if request.is_json:
+        data = request.get_json()
+        if not data or 'image' not in data or 'pose_name' not in data:
+            return None, None, (jsonify({"error": "Image and pose_name are required"}), 400)
+        try:
+            with STAGE_LATENCY.time("decode"):
+                image = decode_image(data['image'])
+            return image, data['pose_name'], None
+        except Exception as e:
+            return None, None, (jsonify({"error": f"Failed to decode image: {str(e)}"}), 500)
+
+    if request.content_length is not None and request.content_length > MAX_UPLOAD_BYTES:
+        return None, None, (jsonify({"error": "Image too large"}), 413)
+
+    pose_name = request.headers.get("X-Pose-Name") or request.args.get("pose_name")
+    if request.mimetype == "multipart/form-data":
+        request.max_content_length = MAX_UPLOAD_BYTES
+        try:
+            upload = request.files.get("image")
+        except RequestEntityTooLarge:
+            return None, None, (jsonify({"error": "Image too large"}), 413)
+        buffer = upload.read() if upload else b""
+        pose_name = pose_name or request.form.get("pose_name")
+    else:
+        # Raw body, decoded straight from the bytes read off the stream
+        buffer = read_body(MAX_UPLOAD_BYTES)
+        if buffer is None:
+            return None, None, (jsonify({"error": "Image too large"}), 413)
+
+    if not buffer or not pose_name:
+        return None, None, (jsonify({"error": "Image and pose_name are required"}), 400)
+    try:
+        with STAGE_LATENCY.time("decode"):
+            image = decode_image_bytes(buffer)
+        return image, pose_name, None
+    except Exception as e:
+        return None, None, (jsonify({"error": f"Failed to decode image: {str(e)}"}), 500)
+
+
 @app.route("/predict_frame", methods=["POST"])
 @jwt_required()   # 🔒 Protect this route
 def predict_frame():
     current_user = get_jwt_identity()
-    user = users_collection.find_one({"email": current_user})
+    denied = check_pose_access(current_user)
+    if denied:
+        return denied
 
-    if not user:
-        return jsonify({"error": "User not found"}), 404
+    # ✅ Process pose prediction (JSON data URL, raw image body or multipart)
+    image, pose_name, error = read_frame_request()
+    if error:
+        return error
 
-    # ✅ Check if user is premium or still in free trial
-    if not user.get("is_premium", False):
-        created_at = user.get("created_at")
-        if not created_at:
-            return jsonify({"error": "User trial info missing"}), 403
+    landmarks_flat, landmarks_struct = extract_frame_landmarks(image)
+    record_frame(landmarks_flat)
+    if landmarks_flat is None:
+        return jsonify({"pose": "no_pose_detected", "feedback": ["No human pose detected."]})
 
-        # Convert created_at to datetime if needed
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at)
+    pose_class, feedback = predict_pose_cached(current_user, landmarks_flat, landmarks_struct, pose_name)
 
-        if datetime.utcnow() > created_at + timedelta(days=1):
-            # ❌ Trial expired
-            return jsonify({
-                "error": "Trial expired. Please upgrade to premium.",
-                "payment_url": "https://rzp.io/rzp/8jKeOewG"  # 🔗 Placeholder
-            }), 403
+    return jsonify({
+        "user": current_user,
+        "pose": pose_class,
+        "feedback": feedback
+    })
 
-    # ✅ Process pose prediction
-    data = request.get_json()
-    if not data or 'image' not in data or 'pose_name' not in data:
-        return jsonify({"error": "Image and pose_name are required"}), 400
 
-    pose_name = data['pose_name']
+# Largest packed landmark body (33x4 float32)
+MAX_LANDMARK_BYTES = FLAT_DIM * 4
 
-    try:
-        image_data = base64.b64decode(data['image'].split(',')[1])
-        npimg = np.frombuffer(image_data, np.uint8)
-        image = cv2.imdecode(npimg, cv2.IMREAD_COLOR)
-    except Exception as e:
-        return jsonify({"error": f"Failed to decode image: {str(e)}"}), 500
 
-    landmarks_flat, landmarks_struct = extract_landmarks(image)
-    if landmarks_flat is None:
-        return jsonify({"pose": "no_pose_detected", "feedback": ["No human pose detected."]})
+@app.route("/predict_landmarks", methods=["POST"])
+@jwt_required()   # 🔒 Protect this route
+def predict_landmarks():
+    """
+    For clients that run Mediapipe on-device: classifies a 33x4 landmark array
+    (x, y, z, visibility; normalized image coordinates) without any image work.
+      - application/json: {"landmarks": [[x, y, z, v], ...] or 132 values, "pose_name": ...}
+      - application/octet-stream: 132 packed little-endian float32 (528 bytes) or
+        float16 (264 bytes); X-Landmark-Dtype may name the dtype, pose_name comes
+        from the X-Pose-Name header or the query string
+    """
+    current_user = get_jwt_identity()
+    denied = check_pose_access(current_user)
+    if denied:
+        return denied
 
-    pose_class, feedback = predict_pose(landmarks_flat, landmarks_struct, pose_name)
+    try:
+        if request.is_json:
+            data = request.get_json()
+            if not data or 'landmarks' not in data or 'pose_name' not in data:
+                return jsonify({"error": "landmarks and pose_name are required"}), 400
+            pose_name = data['pose_name']
+            landmarks = validate_landmarks(data['landmarks'])
+        else:
+            pose_name = request.headers.get("X-Pose-Name") or request.args.get("pose_name")
+            if not pose_name:
+                return jsonify({"error": "pose_name is required"}), 400
+            payload = read_body(MAX_LANDMARK_BYTES)
+            if payload is None:
+                return jsonify({"error": "Landmark payload too large"}), 413
+            landmarks = landmarks_from_bytes(payload, request.headers.get("X-Landmark-Dtype"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid landmarks: {str(e)}"}), 400
+
+    pose_class, feedback = predict_pose_cached(current_user, landmarks.reshape(-1), landmarks, pose_name)
 
     return jsonify({
         "user": current_user,
@@ -93,6 +300,301 @@ def predict_frame():
         "feedback": feedback
     })
 
+
+@app.route("/predict_frames", methods=["POST"])
+@jwt_required()   # 🔒 Protect this route
+def predict_frames():
+    """Batched /predict_frame: one auth check and one model call for N buffered frames."""
+    current_user = get_jwt_identity()
+    denied = check_pose_access(current_user)
+    if denied:
+        return denied
+
+    data = request.get_json()
+    if not data or not isinstance(data.get('images'), list) or 'pose_name' not in data:
+        return jsonify({"error": "images (list) and pose_name are required"}), 400
+
+    images = data['images']
+    if not images:
+        return jsonify({"error": "At least one image is required"}), 400
+    if len(images) > MAX_FRAMES_PER_REQUEST:
+        return jsonify({"error": f"At most {MAX_FRAMES_PER_REQUEST} images per request"}), 400
+
+    pose_name = data['pose_name']
+
+    # Per-frame results; frames without a usable pose are answered directly
+    results = [None] * len(images)
+    decoded, decoded_idx = [], []
+    for i, data_url in enumerate(images):
+        try:
+            with STAGE_LATENCY.time("decode"):
+                decoded.append(decode_image(data_url))
+            decoded_idx.append(i)
+        except Exception as e:
+            results[i] = {"error": f"Failed to decode image: {str(e)}"}
+
+    detected, detected_idx = [], []
+    for i, (landmarks_flat, landmarks_struct) in zip(decoded_idx, extract_frames_landmarks(decoded)):
+        record_frame(landmarks_flat)
+        if landmarks_flat is None:
+            results[i] = {"pose": "no_pose_detected", "feedback": ["No human pose detected."]}
+            continue
+        detected.append((landmarks_flat, landmarks_struct))
+        detected_idx.append(i)
+
+    # ✅ Single batched classifier call for every frame with a pose
+    for i, (pose_class, feedback) in zip(detected_idx, predict_poses(detected, pose_name)):
+        results[i] = {"pose": pose_class, "feedback": feedback}
+
+    return jsonify({
+        "user": current_user,
+        "results": results
+    })
+
+# ===== STREAMING POSE SESSION ENDPOINTS =====
+# Largest single frame accepted on the chunked stream
+MAX_STREAM_FRAME_BYTES = 4 * 1024 * 1024
+
+
+def session_frame_result(session, image, pose_name):
+    """Tracks one frame in the session and classifies it."""
+    landmarks_flat, landmarks_struct = session.process(image)
+    record_frame(landmarks_flat)
+    if landmarks_flat is None:
+        result = {"pose": "no_pose_detected", "feedback": ["No human pose detected."]}
+    else:
+        pose_class, feedback = predict_pose_cached(session.session_id, landmarks_flat, landmarks_struct, pose_name)
+        result = {"pose": pose_class, "feedback": feedback}
+    result["model_complexity"] = session.model_complexity
+    return result
+
+
+def read_exact(stream, size):
+    """Reads exactly size bytes from a (possibly chunked) request stream, or less at EOF."""
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = stream.read(size - len(buf))
+        if not chunk:
+            break
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+@app.route("/pose_session", methods=["POST"])
+@jwt_required()
+def start_pose_session():
+    """Starts a live session with its own video-mode tracker."""
+    current_user = get_jwt_identity()
+    denied = check_pose_access(current_user)
+    if denied:
+        return denied
+
+    data = request.get_json(silent=True) or {}
+    latency_budget_ms = data.get("latency_budget_ms")
+    model_complexity = data.get("model_complexity")
+    try:
+        if latency_budget_ms is not None:
+            latency_budget_ms = float(latency_budget_ms)
+            if latency_budget_ms <= 0:
+                raise ValueError("latency_budget_ms must be positive")
+        if model_complexity is not None:
+            model_complexity = int(model_complexity)
+            if not MIN_COMPLEXITY <= model_complexity <= MAX_COMPLEXITY:
+                raise ValueError(f"model_complexity must be {MIN_COMPLEXITY}-{MAX_COMPLEXITY}")
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid session options: {str(e)}"}), 400
+
+    session = session_manager.create(current_user, latency_budget_ms, model_complexity)
+    if session is None:
+        return jsonify({"error": "Too many live sessions, try again later"}), 503
+
+    return jsonify(session.to_dict()), 201
+
+
+@app.route("/pose_session/<session_id>/frame", methods=["POST"])
+@jwt_required()
+def pose_session_frame(session_id):
+    """Sends one frame (JSON data URL, raw image body or multipart) to a live session."""
+    current_user = get_jwt_identity()
+    session = session_manager.get(session_id, current_user)
+    if session is None:
+        return jsonify({"error": "Session not found"}), 404
+    # Re-checked per frame (cached): a trial can end while the session is open
+    denied = check_pose_access(current_user)
+    if denied:
+        return denied
+
+    image, pose_name, error = read_frame_request()
+    if error:
+        return error
+
+    result = session_frame_result(session, image, pose_name)
+    result["user"] = current_user
+    return jsonify(result)
+
+
+@app.route("/pose_session/<session_id>/stream", methods=["POST"])
+@jwt_required()
+def pose_session_stream(session_id):
+    """
+    Chunked streaming: the request body is a sequence of frames, each a 4-byte
+    big-endian length followed by the encoded image (JPEG/PNG). One JSON line
+    is streamed back per frame as soon as it is processed.
+    """
+    current_user = get_jwt_identity()
+    session = session_manager.get(session_id, current_user)
+    if session is None:
+        return jsonify({"error": "Session not found"}), 404
+
+    pose_name = request.args.get("pose_name")
+    if not pose_name:
+        return jsonify({"error": "pose_name query parameter is required"}), 400
+    denied = check_pose_access(current_user)
+    if denied:
+        return denied
+
+    stream = request.stream
+
+    def generate():
+        while True:
+            # Re-checked per frame (cached): a trial can end mid-stream
+            denied = check_pose_access(current_user)
+            if denied:
+                yield json.dumps(denied[0].get_json()) + "\n"
+                break
+            header = read_exact(stream, 4)
+            if len(header) < 4:
+                break
+            size = int.from_bytes(header, "big")
+            if size > MAX_STREAM_FRAME_BYTES:
+                yield json.dumps({"error": "Frame too large"}) + "\n"
+                break
+            payload = read_exact(stream, size)
+            if len(payload) < size:
+                break
+
+            try:
+                with STAGE_LATENCY.time("decode"):
+                    image = decode_image_bytes(payload)
+            except ValueError:
+                yield json.dumps({"error": "Failed to decode image"}) + "\n"
+                continue
+            yield json.dumps(session_frame_result(session, image, pose_name)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@app.route("/pose_session/<session_id>", methods=["DELETE"])
+@jwt_required()
+def end_pose_session(session_id):
+    current_user = get_jwt_identity()
+    if not session_manager.close(session_id, current_user):
+        return jsonify({"error": "Session not found"}), 404
+    frame_cache.invalidate(session_id)
+    return jsonify({"message": "Session closed"}), 200
+
+
+# ===== RECORDED SESSION ANALYSIS (ASYNC JOBS) =====
+# Largest video accepted by /video_jobs
+MAX_VIDEO_BYTES = int(os.getenv("MAX_VIDEO_UPLOAD_MB", "500")) * 1024 * 1024
+VIDEO_UPLOAD_EXTENSIONS = ('.mp4', '.avi', '.mov', '.webm', '.mkv')
+_UPLOAD_CHUNK = 1 << 20
+
+
+@app.route("/video_jobs", methods=["POST"])
+@jwt_required()
+def submit_video_job():
+    """
+    Queues a recorded session for offline analysis. The video is a multipart
+    "video" file part or the raw request body; pose_name and the optional
+    sample_fps come from the form, the X-Pose-Name header or the query string.
+    Returns 202 with the job id to poll.
+    """
+    current_user = get_jwt_identity()
+    denied = check_pose_access(current_user)
+    if denied:
+        return denied
+
+    if request.content_length is not None and request.content_length > MAX_VIDEO_BYTES:
+        return jsonify({"error": "Video too large"}), 413
+    # One byte over the limit is let through so the copy below can tell an
+    # oversized chunked upload from one of exactly MAX_VIDEO_BYTES
+    request.max_content_length = MAX_VIDEO_BYTES + 1
+
+    pose_name = request.headers.get("X-Pose-Name") or request.args.get("pose_name")
+    sample_fps = request.args.get("sample_fps")
+    if request.mimetype == "multipart/form-data":
+        try:
+            stream = request.files.get("video")
+        except RequestEntityTooLarge:
+            return jsonify({"error": "Video too large"}), 413
+        pose_name = pose_name or request.form.get("pose_name")
+        sample_fps = sample_fps or request.form.get("sample_fps")
+        extension = os.path.splitext(stream.filename or "")[1].lower() if stream else ""
+    else:
+        stream = request.stream
+        extension = ""
+    if not stream or not pose_name:
+        return jsonify({"error": "Video and pose_name are required"}), 400
+
+    try:
+        sample_fps = float(sample_fps) if sample_fps else DEFAULT_SAMPLE_FPS
+        if not 0 < sample_fps <= MAX_SAMPLE_FPS:
+            raise ValueError(f"sample_fps must be between 0 and {MAX_SAMPLE_FPS}")
+    except ValueError as e:
+        return jsonify({"error": f"Invalid sample_fps: {str(e)}"}), 400
+
+    # Copy to disk in chunks; the upload is never held in memory
+    manager = get_job_manager()
+    job_id, video_path = manager.new_upload_path(
+        extension if extension in VIDEO_UPLOAD_EXTENSIONS else ".mp4")
+    written = 0
+    with open(video_path, "wb") as f:
+        for chunk in iter(lambda: stream.read(_UPLOAD_CHUNK), b""):
+            written += len(chunk)
+            if written > MAX_VIDEO_BYTES:
+                break
+            f.write(chunk)
+
+    if written == 0 or written > MAX_VIDEO_BYTES:
+        os.remove(video_path)
+        if written:
+            return jsonify({"error": "Video too large"}), 413
+        return jsonify({"error": "Video and pose_name are required"}), 400
+
+    try:
+        job = manager.submit(job_id, current_user, video_path, pose_name, sample_fps)
+    except IOError:
+        os.remove(video_path)
+        return jsonify({"error": "Failed to read video"}), 400
+
+    return jsonify(job.status_dict()), 202
+
+
+@app.route("/video_jobs/<job_id>", methods=["GET"])
+@jwt_required()
+def video_job_status(job_id):
+    job = get_job_manager().get(job_id, get_jwt_identity())
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.status_dict())
+
+
+@app.route("/video_jobs/<job_id>/result", methods=["GET"])
+@jwt_required()
+def video_job_result(job_id):
+    """Per-second pose timeline, hold segments and summary of a finished job."""
+    manager = get_job_manager()
+    job = manager.get(job_id, get_jwt_identity())
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job.status == FAILED:
+        return jsonify({"error": f"Analysis failed: {job.error}"}), 500
+    if job.status != DONE:
+        return jsonify({"error": "Analysis not finished", "status": job.status}), 409
+    return jsonify(manager.result(job))
+
+
 # ===== NUTRITION RECOMMENDATION ENDPOINT =====
 @app.route('/api/nutrition_recommendation', methods=['POST'])
 @jwt_required()
@@ -114,7 +616,7 @@ def get_nutrition_recommendation():
         activity_level = data['activity_level']
         diseases = data.get('diseases', [])
 
-        recommendations = nutrition_engine.get_recommendations(
+        recommendations = nutrition_engine.get().get_recommendations(
             height=height,
             weight=weight,
             age=age,
@@ -151,7 +653,7 @@ def get_health_status():
         gender = data['gender']
         diseases = data.get('diseases', [])
 
-        health_info = nutrition_engine.calculate_health_metrics(height, weight)
+        health_info = nutrition_engine.get().calculate_health_metrics(height, weight)
         return jsonify({
             "user": current_user,
             "health_info": health_info
@@ -207,9 +709,5 @@ def track_sleep():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
-@app.before_request
-def log_headers():
-    print("HEADERS:", dict(request.headers))
-
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,114 @@
+# augmentation.py
+# Landmark-space data augmentation: new training samples are derived from the
+# (N, 33, 4) arrays Mediapipe already produced instead of re-running pose
+# estimation on more images. Numpy-only, like features.py.
+import numpy as np
+
+try:
+    from features import build_features, NUM_LANDMARKS, LANDMARK_DIMS, FLAT_DIM
+except ImportError:
+    from backend.features import build_features, NUM_LANDMARKS, LANDMARK_DIMS, FLAT_DIM
+
+# Mediapipe Pose landmark order with left and right swapped (nose stays put)
+MIRROR_INDEX = np.array([
+    0,
+    4, 5, 6,        # eyes (inner, centre, outer)
+    1, 2, 3,
+    8, 7,           # ears
+    10, 9,          # mouth
+    12, 11,         # shoulders
+    14, 13,         # elbows
+    16, 15,         # wrists
+    18, 17,         # pinkies
+    20, 19,         # index fingers
+    22, 21,         # thumbs
+    24, 23,         # hips
+    26, 25,         # knees
+    28, 27,         # ankles
+    30, 29,         # heels
+    32, 31,         # foot index
+])
+_HIPS = [23, 24]
+
+DEFAULT_PARAMS = {
+    "mirror_prob": 0.5,       # chance of a left/right flip
+    "max_rotation": 10.0,     # degrees, in the image plane around the hip centre
+    "scale_range": (0.9, 1.1),
+    "max_shift": 0.05,        # translation, in normalized image coordinates
+    "jitter": 0.005,          # std of per-landmark gaussian noise on x, y, z
+    "dropout_prob": 0.05,     # chance a landmark's visibility is zeroed
+    "aspect_ratio": 1.0,      # width / height of the source images, scalar or one per sample
+}
+
+
+def mirror(landmarks):
+    """Left/right flip of (..., 33, 4) landmarks: x → 1 - x and left/right indices swapped."""
+    flipped = np.array(landmarks, dtype=np.float32)[..., MIRROR_INDEX, :]
+    flipped[..., 0] = 1.0 - flipped[..., 0]
+    return flipped
+
+
+def augment_landmarks(landmarks, copies=10, rng=None, **params):
+    """
+    Returns (N * copies, 33, 4) randomly transformed variants of (N, 33, 4)
+    landmarks; sample i's copies are rows i*copies ... i*copies + copies - 1.
+    Every transform is drawn per copy and applied to the whole batch with
+    broadcasting, so this costs milliseconds even for 50 copies.
+    Keyword arguments override DEFAULT_PARAMS.
+
+    x and y are normalized by image width and height respectively, so the
+    rotation is done with x scaled by aspect_ratio (square units) and x is
+    divided back afterwards; rotating the raw coordinates would shear poses
+    taken from non-square images.
+    """
+    unknown = set(params) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown augmentation parameters: {', '.join(sorted(unknown))}")
+    p = {**DEFAULT_PARAMS, **params}
+    rng = np.random.default_rng(rng)
+
+    base = np.asarray(landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, LANDMARK_DIMS)
+    out = np.repeat(base, copies, axis=0)
+    n = len(out)
+    if n == 0:
+        return out
+    aspect = np.repeat(np.broadcast_to(np.asarray(p["aspect_ratio"], dtype=np.float32), len(base)), copies)
+    aspect = aspect[:, None, None]     # (n, 1, 1), per copy
+
+    flip = rng.random(n) < p["mirror_prob"]
+    out[flip] = mirror(out[flip])
+
+    # Rotation + scale around the hip centre in square units, then translation
+    xy = out[..., :2].copy()
+    xy[..., 0] *= aspect[..., 0]
+    centre = xy[:, _HIPS].mean(axis=1, keepdims=True)
+    theta = np.radians(rng.uniform(-p["max_rotation"], p["max_rotation"], n))
+    scale = rng.uniform(*p["scale_range"], n).astype(np.float32)
+    cos, sin = np.cos(theta), np.sin(theta)
+    rotation = np.stack([np.stack([cos, -sin], -1), np.stack([sin, cos], -1)], -2).astype(np.float32)
+    shift = rng.uniform(-p["max_shift"], p["max_shift"], (n, 1, 2)).astype(np.float32)
+    xy = np.einsum("nij,nkj->nki", rotation, xy - centre) * scale[:, None, None] + centre
+    xy[..., 0] /= aspect[..., 0]
+    out[..., :2] = xy + shift
+    out[..., 2] *= scale[:, None]
+
+    if p["jitter"]:
+        out[..., :3] += rng.normal(0.0, p["jitter"], (n, NUM_LANDMARKS, 3)).astype(np.float32)
+    if p["dropout_prob"]:
+        out[..., 3][rng.random((n, NUM_LANDMARKS)) < p["dropout_prob"]] = 0.0
+    return out
+
+
+def augment_features(X, y, copies=10, rng=None, include_original=True, **params):
+    """
+    Expands a (N, 138) feature matrix and its labels by `copies` augmented
+    variants per row. The landmarks are recovered from the first 132 columns
+    and the angle features are recomputed for every augmented sample.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    augmented = build_features(augment_landmarks(X[:, :FLAT_DIM], copies, rng, **params))
+    labels = np.repeat(y, copies, axis=0)
+    if include_original:
+        return np.concatenate([X, augmented]), np.concatenate([y, labels])
+    return augmented, labels
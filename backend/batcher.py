@@ -0,0 +1,122 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Collects feature vectors from concurrent requests and runs them through
+    the classifier as one batch.
+
+    predict_fn: callable taking a (N, D) float32 matrix, returning (N, C) scores
+    max_batch_size: largest batch handed to predict_fn
+    max_wait_ms: how long the first queued row waits for company
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._closed = False
+
+    def _ensure_worker(self):
+        # Caller holds self._lock
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="pose-micro-batcher", daemon=True
+            )
+            self._worker.start()
+
+    def predict(self, features):
+        """
+        Blocks until every row of `features` has been scored.
+        Accepts one vector (D,) or a matrix (N, D); returns (N, C) scores.
+        After close(), rows are scored inline on the calling thread.
+        """
+        features = np.asarray(features, dtype=np.float32)
+        if features.ndim == 1:
+            features = features[np.newaxis, :]
+
+        futures = []
+        with self._lock:
+            # Checked and queued under the lock, so no row lands behind close()'s sentinel
+            if not self._closed:
+                for row in features:
+                    future = Future()
+                    self._queue.put((row, future))
+                    futures.append(future)
+                self._ensure_worker()
+        if not futures:
+            return self.predict_fn(features)
+
+        return np.stack([future.result() for future in futures])
+
+    def close(self):
+        """Stops the worker once the rows already queued have been scored."""
+        with self._lock:
+            self._closed = True
+            if self._worker is not None and self._worker.is_alive():
+                self._queue.put(None)
+
+    def _collect(self):
+        """
+        Waits for one row, then gathers more until the batch is full or the
+        window closes. A None from close() ends the batch and is kept last.
+        """
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while batch[-1] is not None and len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self):
+        """Rows still queued when closing (none are expected, since predict checks _closed)."""
+        rows = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return rows
+            if item is not None:
+                rows.append(item)
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            closing = batch[-1] is None
+            if closing:
+                batch.pop()
+                batch.extend(self._drain())
+            for start in range(0, len(batch), self.max_batch_size):
+                self._score(batch[start:start + self.max_batch_size])
+            if closing:
+                return
+
+    def _score(self, batch):
+        rows = np.stack([row for row, _ in batch])
+        futures = [future for _, future in batch]
+        try:
+            scores = self.predict_fn(rows)
+        except Exception as e:
+            logging.error(f"Batched prediction failed for {len(batch)} rows: {e}")
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        logging.debug(f"Micro-batch of {len(batch)} rows scored.")
+        for future, score in zip(futures, scores):
+            future.set_result(score)
@@ -0,0 +1,265 @@
+"""
+Pose pipeline benchmark.
+
+Replays the dataset images (and optionally a video) through each stage of the
+pose path and reports per-stage p50/p95/p99 latency, end-to-end frames/sec at
+increasing concurrency and peak RSS. Results are written as JSON; with
+--baseline the run fails when it regresses beyond --threshold.
+
+    python -m backend.benchmark --out bench.json
+    python -m backend.benchmark --baseline bench.json --threshold 0.15
+
+Run from the repository root (model paths are relative to it).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from backend import pose_estimator, predictor
+from backend.features import build_features
+from backend.pose_estimator import extract_landmarks, preprocess_frame_rgb
+from backend.pose_feedback import get_tree_pose_feedback
+from backend.pose_workers import POSE_WORKERS, extract_frame_landmarks
+
+DATASET_DIR = "backend/yoga_poses_dataset"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+PERCENTILES = (50, 95, 99)
+
+
+def load_frames(dataset_dir=DATASET_DIR, video=None, max_frames=None):
+    """
+    Returns [(name, encoded bytes or None, BGR frame)] from the dataset images
+    and an optional video. Stops decoding once max_frames frames (images and
+    video together) are held, so a long video doesn't inflate peak RSS.
+    """
+    frames = []
+
+    def full():
+        return bool(max_frames) and len(frames) >= max_frames
+
+    for root, _, files in sorted(os.walk(dataset_dir)):
+        for file in sorted(files):
+            if full():
+                return frames
+            if not file.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            path = os.path.join(root, file)
+            with open(path, "rb") as f:
+                encoded = f.read()
+            image = cv2.imdecode(np.frombuffer(encoded, np.uint8), cv2.IMREAD_COLOR)
+            if image is not None:
+                frames.append((path, encoded, image))
+
+    if video:
+        cap = cv2.VideoCapture(video)
+        index = 0
+        while not full():
+            ok, image = cap.read()
+            if not ok:
+                break
+            frames.append((f"{video}#{index}", None, image))
+            index += 1
+        cap.release()
+
+    return frames
+
+
+def summarize(samples_ms):
+    samples = np.asarray(samples_ms)
+    if not len(samples):
+        return {"count": 0}
+    summary = {f"p{p}": round(float(np.percentile(samples, p)), 3) for p in PERCENTILES}
+    summary["mean"] = round(float(samples.mean()), 3)
+    summary["count"] = int(len(samples))
+    return summary
+
+
+def _timed(timings, stage, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    timings.setdefault(stage, []).append((time.perf_counter() - start) * 1000.0)
+    return result
+
+
+def bench_stages(frames, pose_name="treepose", repeat=1):
+    """Runs every frame through each stage on one thread; returns ({stage: summary}, detection rate)."""
+    bundle = predictor.pose_model.get()
+    timings = {}
+    detected = 0
+    for _ in range(repeat):
+        for _, encoded, image in frames:
+            if encoded is not None:
+                _timed(timings, "decode", cv2.imdecode, np.frombuffer(encoded, np.uint8), cv2.IMREAD_COLOR)
+            _timed(timings, "preprocess_frame_rgb", preprocess_frame_rgb, image)
+            flat, landmarks = _timed(timings, "extract_landmarks", extract_landmarks, image)
+            if flat is None:
+                continue
+            detected += 1
+            features = _timed(timings, "build_features", build_features, landmarks[np.newaxis])
+            scores = _timed(timings, "model", bundle.model.predict, features, verbose=0)
+            pose_class = bundle.label(np.argmax(scores))
+            _timed(timings, "predict_pose", predictor.predict_pose, flat, landmarks, pose_name)
+            _timed(timings, "feedback", get_tree_pose_feedback, pose_class, landmarks)
+
+    total = len(frames) * repeat
+    return {stage: summarize(values) for stage, values in timings.items()}, detected / max(total, 1)
+
+
+def bench_throughput(frames, concurrency, pose_name="treepose", min_frames=None, per_thread_detectors=False):
+    """
+    End-to-end frames/sec (decode → landmarks → predict_pose) with `concurrency`
+    client threads, through extract_frame_landmarks like app.py: inline
+    extraction shares the one detector behind its lock, so lock contention
+    shows up here. per_thread_detectors=True instead gives every thread its
+    own static-image detector (inline only), as an upper bound for comparison.
+    """
+    min_frames = min_frames or max(len(frames), concurrency * 8)
+    local = threading.local()
+
+    def landmarks_for(image):
+        if not per_thread_detectors or POSE_WORKERS > 0:
+            return extract_frame_landmarks(image)
+        detector = getattr(local, "detector", None)
+        if detector is None:
+            detector = local.detector = pose_estimator._load_pose()
+            pose_estimator._warm_pose(detector)
+        return extract_landmarks(image, tracker=detector)
+
+    def run(index):
+        _, encoded, image = frames[index % len(frames)]
+        if encoded is not None:
+            image = cv2.imdecode(np.frombuffer(encoded, np.uint8), cv2.IMREAD_COLOR)
+        flat, landmarks = landmarks_for(image)
+        if flat is not None:
+            predictor.predict_pose(flat, landmarks, pose_name)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Warm every thread's detector before timing
+        list(executor.map(run, range(concurrency)))
+        start = time.perf_counter()
+        list(executor.map(run, range(min_frames)))
+        elapsed = time.perf_counter() - start
+    return round(min_frames / elapsed, 2)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its (worker) children, in MB."""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024   # ru_maxrss is bytes on macOS, KB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return {"self": round(own, 1), "children": round(children, 1)}
+
+
+def compare(result, baseline, threshold):
+    """Returns a list of regressions (stage p95/p99, frames/sec, peak RSS) beyond threshold."""
+    regressions = []
+    for stage, summary in baseline.get("stages", {}).items():
+        current = result["stages"].get(stage)
+        if not current or not current.get("count") or not summary.get("count"):
+            continue
+        for key in ("p95", "p99"):
+            if current[key] > summary[key] * (1 + threshold):
+                regressions.append(f"{stage} {key}: {summary[key]:.3f} ms → {current[key]:.3f} ms")
+
+    for concurrency, fps in baseline.get("throughput", {}).items():
+        current = result["throughput"].get(concurrency)
+        if current is not None and current < fps * (1 - threshold):
+            regressions.append(f"fps @ {concurrency}: {fps} → {current}")
+    for concurrency, fps in baseline.get("throughput_per_thread_detectors", {}).items():
+        current = result.get("throughput_per_thread_detectors", {}).get(concurrency)
+        if current is not None and current < fps * (1 - threshold):
+            regressions.append(f"fps @ {concurrency} (one detector per thread): {fps} → {current}")
+
+    base_rss = baseline.get("peak_rss_mb", {}).get("self")
+    if base_rss and result["peak_rss_mb"]["self"] > base_rss * (1 + threshold):
+        regressions.append(f"peak RSS: {base_rss} MB → {result['peak_rss_mb']['self']} MB")
+    return regressions
+
+
+def run_benchmark(args):
+    frames = load_frames(args.dataset, args.video, args.max_frames)
+    if not frames:
+        raise SystemExit(f"No frames found in {args.dataset}")
+    print(f"Benchmarking {len(frames)} frames (backend={predictor.INFERENCE_BACKEND}, workers={POSE_WORKERS})")
+
+    # Load + warm everything so cold starts don't pollute the percentiles
+    bench_stages(frames[:2], args.pose_name)
+
+    stages, detection_rate = bench_stages(frames, args.pose_name, args.repeat)
+    throughput = {}
+    for concurrency in range(1, args.concurrency + 1):
+        throughput[str(concurrency)] = bench_throughput(frames, concurrency, args.pose_name)
+        print(f"  {concurrency} client(s): {throughput[str(concurrency)]} frames/sec")
+    per_thread = {}
+    if args.per_thread_detectors and POSE_WORKERS <= 0:
+        for concurrency in range(1, args.concurrency + 1):
+            per_thread[str(concurrency)] = bench_throughput(frames, concurrency, args.pose_name,
+                                                            per_thread_detectors=True)
+            print(f"  {concurrency} client(s), one detector per thread: {per_thread[str(concurrency)]} frames/sec")
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "frames": len(frames),
+            "repeat": args.repeat,
+            "detection_rate": round(detection_rate, 4),
+            "inference_backend": predictor.INFERENCE_BACKEND,
+            "pose_workers": POSE_WORKERS,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "stages": stages,
+        "throughput": throughput,
+        "throughput_per_thread_detectors": per_thread,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pose pipeline stage by stage.")
+    parser.add_argument("--dataset", default=DATASET_DIR)
+    parser.add_argument("--video", help="also replay every frame of this video file")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the frames for stage timings")
+    parser.add_argument("--concurrency", type=int, default=4, help="measure frames/sec for 1..N clients")
+    parser.add_argument("--per-thread-detectors", action="store_true",
+                        help="also measure inline frames/sec with one detector per client thread")
+    parser.add_argument("--pose-name", default="treepose")
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args)
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print(f"\n{'stage':<22}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    for stage, summary in result["stages"].items():
+        if summary.get("count"):
+            print(f"{stage:<22}{summary['p50']:>9.2f}{summary['p95']:>9.2f}{summary['p99']:>9.2f}")
+    print(f"peak RSS: {result['peak_rss_mb']} MB → results in {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        if regressions:
+            print("REGRESSIONS:\n  " + "\n  ".join(regressions))
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+# compact.py
+# Post-training model selection: distills the trained MLP into smaller
+# students, measures accuracy, file size and single-frame / batched latency of
+# every (architecture, weight dtype) candidate, and exports the smallest one
+# within the accuracy tolerance as a weights-only .npz for serving.
+#
+#   python compact.py --model yoga_pose_model.h5 --tolerance 0.01 --out yoga_pose_model.npz
+#   POSE_MODEL_PATH=backend/yoga_pose_model.npz python app.py
+#
+# Run from backend/ like train.py.
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from numpy_model import NumpyPoseModel, EXPORT_DTYPES
+from sweep import single_frame_latency_ms
+
+STUDENT_ARCHITECTURES = [(64, 32), (64,), (32,), (16,)]
+DISTILL_COPIES = 10       # augmented variants per training sample, labelled by the teacher
+DISTILL_EPOCHS = 300
+PATIENCE = 15
+BATCH_SIZE = 32           # batch size for the batched latency measurement
+BATCH_CALLS = 200
+
+
+def batched_latency_ms(model, X, batch_size=BATCH_SIZE, calls=BATCH_CALLS):
+    """Median latency per frame when frames are scored batch_size at a time."""
+    batch = X[np.arange(batch_size) % len(X)]
+    timings = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        model.predict(batch)
+        timings[i] = time.perf_counter() - start
+    return float(np.median(timings) * 1000.0 / batch_size)
+
+
+def distill(teacher, X_train, y_train, hidden_units, seed=42):
+    """
+    Trains a smaller MLP on the teacher's class probabilities for the training
+    samples and DISTILL_COPIES augmented variants of each.
+    """
+    import tensorflow as tf
+    from sklearn.model_selection import train_test_split
+    from tensorflow.keras.callbacks import EarlyStopping
+    from model_trainer import create_model
+    from augmentation import augment_features
+
+    tf.keras.utils.set_random_seed(seed)
+    X_aug, _ = augment_features(X_train, y_train, copies=DISTILL_COPIES, rng=seed)
+    soft_targets = teacher.predict(X_aug)
+    X_fit, X_stop, t_fit, t_stop = train_test_split(X_aug, soft_targets, test_size=0.1, random_state=seed)
+
+    student = create_model(X_train.shape[1], soft_targets.shape[1], hidden_units, dropout=0.1)
+    student.fit(
+        X_fit, t_fit,
+        validation_data=(X_stop, t_stop),
+        epochs=DISTILL_EPOCHS,
+        batch_size=64,
+        callbacks=[EarlyStopping(monitor="val_loss", patience=PATIENCE, restore_best_weights=True)],
+        verbose=0,
+    )
+    return NumpyPoseModel.from_keras(student)
+
+
+def evaluate_candidates(models, X_test, y_test, class_names, work_dir):
+    """Exports every model in every dtype, reloads it and measures the exported file."""
+    rows = []
+    for name, model in models.items():
+        for dtype in EXPORT_DTYPES:
+            path = os.path.join(work_dir, f"{name}-{dtype}.npz")
+            model.save_npz(path, dtype, class_names)
+            exported = NumpyPoseModel.from_npz(path)
+            rows.append({
+                "name": name,
+                "dtype": dtype,
+                "path": path,
+                "hidden_units": [layer.kernel.shape[1] for layer in exported.layers[:-1]],
+                "accuracy": round(float(np.mean(exported.predict(X_test).argmax(axis=1) == y_test)), 4),
+                "size_kb": round(os.path.getsize(path) / 1024, 1),
+                "single_ms": round(single_frame_latency_ms(exported, X_test), 4),
+                "batched_ms_per_frame": round(batched_latency_ms(exported, X_test), 4),
+            })
+    return rows
+
+
+def select(rows, reference_accuracy, tolerance):
+    """Smallest candidate (then fastest single frame) within tolerance of the reference accuracy."""
+    eligible = [row for row in rows if row["accuracy"] >= reference_accuracy - tolerance]
+    return min(eligible, key=lambda row: (row["size_kb"], row["single_ms"])) if eligible else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Select and export a compact pose model.")
+    parser.add_argument("--model", default="yoga_pose_model.h5", help="trained Keras model (the teacher)")
+    parser.add_argument("--classes", default="yoga_poses_classes.json")
+    parser.add_argument("--dataset", default="yoga_poses_dataset")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="allowed accuracy drop vs. the teacher")
+    parser.add_argument("--out", default="yoga_pose_model.npz")
+    parser.add_argument("--report", default="compact_report.json")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    from sklearn.model_selection import train_test_split
+    from dataset_processor import process_dataset
+
+    with open(args.classes) as f:
+        class_names = json.load(f)
+    X, y, _ = process_dataset(args.dataset)
+    if len(X) == 0:
+        print("No valid data was extracted from the dataset.")
+        return 1
+    # Same hold-out split as train_yoga_model, so the teacher is scored on unseen data
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    teacher = NumpyPoseModel.from_h5(args.model)
+    teacher_accuracy = float(np.mean(teacher.predict(X_test).argmax(axis=1) == y_test))
+    print(f"Teacher {args.model}: accuracy {teacher_accuracy:.4f} on {len(X_test)} held-out samples")
+
+    models = {"teacher": teacher}
+    for hidden_units in STUDENT_ARCHITECTURES:
+        name = "student-" + "x".join(str(units) for units in hidden_units)
+        print(f"Distilling {name}...")
+        models[name] = distill(teacher, X_train, y_train, hidden_units, args.seed)
+
+    work_dir = tempfile.mkdtemp(prefix="compact-")
+    try:
+        rows = evaluate_candidates(models, X_test, y_test, class_names, work_dir)
+        chosen = select(rows, teacher_accuracy, args.tolerance)
+
+        print(f"\n{'candidate':<18}{'dtype':>8}{'accuracy':>10}{'size KB':>9}{'single ms':>11}{'batched ms':>12}")
+        for row in sorted(rows, key=lambda row: row["size_kb"]):
+            marker = "  <- selected" if row is chosen else ""
+            print(f"{row['name']:<18}{row['dtype']:>8}{row['accuracy']:>10.4f}{row['size_kb']:>9.1f}"
+                  f"{row['single_ms']:>11.4f}{row['batched_ms_per_frame']:>12.4f}{marker}")
+
+        if chosen is None:
+            print(f"No candidate within {args.tolerance} of the teacher accuracy; nothing exported.")
+            return 1
+        shutil.copyfile(chosen["path"], args.out)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    source_kb = os.path.getsize(args.model) / 1024
+    print(f"\nExported {chosen['name']} ({chosen['dtype']}) to {args.out}: "
+          f"{chosen['size_kb']:.1f} KB vs {source_kb:.1f} KB for {args.model}")
+    with open(args.report, "w") as f:
+        json.dump({
+            "teacher_accuracy": round(teacher_accuracy, 4),
+            "tolerance": args.tolerance,
+            "selected": {k: v for k, v in chosen.items() if k != "path"},
+            "candidates": [{k: v for k, v in row.items() if k != "path"} for row in rows],
+        }, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,69 +1,175 @@
-from utils import extract_landmarks, calculate_angle
+from utils import extract_landmarks, get_pose, POSE_OPTIONS
+from features import build_features, FEATURE_DIM, ANGLE_JOINTS
+from feature_store import FeatureStore
+from video_ingest import sample_frames
+from importlib import metadata
+import multiprocessing as mp
 import os
+import sys
+import time
 import cv2
 import numpy as np
 
-def process_dataset(dataset_path):
-    X, y = [], []
-    
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov')
+VIDEO_SAMPLE_FPS = 6.0       # training samples per second of video (every 5th frame at 30 fps)
+VIDEO_DEDUP_THRESHOLD = 2.0  # drop samples that barely differ from the previous one
+POOL_MIN_FILES = 32      # fewer files are extracted inline (worker startup costs seconds)
+
+
+def list_dataset(dataset_path):
+    """Returns (pose_dict, [(file_path, label)]) for every image/video under dataset_path/<pose>/."""
     pose_types = os.listdir(dataset_path)
     pose_dict = {pose_type: idx for idx, pose_type in enumerate(pose_types)}
-    
+
+    tasks = []
     for pose_type in pose_types:
         pose_path = os.path.join(dataset_path, pose_type)
         if not os.path.isdir(pose_path):
             continue
-
-        for file_name in os.listdir(pose_path):
+        for file_name in sorted(os.listdir(pose_path)):
             file_path = os.path.join(pose_path, file_name)
+            if file_path.lower().endswith(IMAGE_EXTENSIONS + VIDEO_EXTENSIONS):
+                tasks.append((file_path, pose_dict[pose_type]))
+    return pose_dict, tasks
+
+
+def extract_file(file_path):
+    """Landmark arrays (33, 4) for every detected pose in one image or video (may be empty)."""
+    samples = []
+
+    # ---- Images ----
+    if file_path.lower().endswith(IMAGE_EXTENSIONS):
+        img = cv2.imread(file_path)
+        if img is not None:
+            flat, landmarks = extract_landmarks(img)
+            if flat is not None:
+                samples.append(landmarks)
 
-            # ---- Images ----
-            if file_path.lower().endswith(('.png', '.jpg', '.jpeg')):
-                img = cv2.imread(file_path)
-                if img is None:
-                    continue
-                flat, landmarks = extract_landmarks(img)
+    # ---- Videos ----
+    elif file_path.lower().endswith(VIDEO_EXTENSIONS):
+        try:
+            for frame in sample_frames(file_path, target_fps=VIDEO_SAMPLE_FPS,
+                                       dedup_threshold=VIDEO_DEDUP_THRESHOLD):
+                flat, landmarks = extract_landmarks(frame.image)
                 if flat is not None:
-                    feature_vector = build_feature_vector(flat, landmarks)
-                    X.append(feature_vector)
-                    y.append(pose_dict[pose_type])
-
-            # ---- Videos ----
-            elif file_path.lower().endswith(('.mp4', '.avi', '.mov')):
-                cap = cv2.VideoCapture(file_path)
-                frame_count = 0
-                while cap.isOpened():
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-                    frame_count += 1
-                    if frame_count % 5 != 0:  # sample every 5th frame
-                        continue
-                    flat, landmarks = extract_landmarks(frame)
-                    if flat is not None:
-                        feature_vector = build_feature_vector(flat, landmarks)
-                        X.append(feature_vector)
-                        y.append(pose_dict[pose_type])
-                cap.release()
-
-    # ✅ Ensure uniform shape
-    X = np.array(X, dtype=np.float32)
-    y = np.array(y)
-    return X, y, pose_dict
+                    samples.append(landmarks)
+        except IOError:
+            pass
+
+    return samples
+
+
+def _init_worker():
+    """Builds the worker's long-lived Pose instance before its first file."""
+    get_pose()
+
+
+def _extract_task(file_path):
+    return file_path, extract_file(file_path)
 
 
-def build_feature_vector(flat, landmarks):
-    """Combine raw landmarks + selected joint angles into one vector"""
-    angles = []
-    # Arms
-    angles.append(calculate_angle(landmarks[11], landmarks[13], landmarks[15]))  # left arm
-    angles.append(calculate_angle(landmarks[12], landmarks[14], landmarks[16]))  # right arm
-    # Legs
-    angles.append(calculate_angle(landmarks[23], landmarks[25], landmarks[27]))  # left leg
-    angles.append(calculate_angle(landmarks[24], landmarks[26], landmarks[28]))  # right leg
-    # Torso
-    angles.append(calculate_angle(landmarks[11], landmarks[23], landmarks[25]))  # left hip
-    angles.append(calculate_angle(landmarks[12], landmarks[24], landmarks[26]))  # right hip
-
-    # ✅ Flatten into hybrid vector
-    return np.concatenate([flat, np.array(angles, dtype=np.float32)])
+def _report_progress(done, total, samples, start, final=False):
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    eta = (total - done) / rate if rate > 0 else 0.0
+    sys.stderr.write(f"\r[{done}/{total}] files, {samples} poses, {rate:.1f} files/s, ETA {eta:.0f}s  ")
+    if final:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+def extract_dataset(file_paths, workers=None, progress=True):
+    """
+    Extracts landmarks for file_paths across a process pool (one long-lived
+    Pose per worker) and yields (file_path, samples) in order as results
+    stream back. workers=0 (or a short list) extracts in this process.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if not file_paths:
+        return
+
+    pool = None
+    if workers > 0 and len(file_paths) >= POOL_MIN_FILES:
+        # Spawn: training scripts may already have TensorFlow threads running
+        pool = mp.get_context("spawn").Pool(min(workers, len(file_paths)), initializer=_init_worker)
+        results = pool.imap(_extract_task, file_paths, chunksize=4)
+    else:
+        results = map(_extract_task, file_paths)
+
+    start = time.perf_counter()
+    last_report = 0.0
+    total_samples = 0
+    try:
+        for done, (file_path, samples) in enumerate(results, 1):
+            total_samples += len(samples)
+            if progress and time.perf_counter() - last_report > 0.5:
+                last_report = time.perf_counter()
+                _report_progress(done, len(file_paths), total_samples, start)
+            yield file_path, samples
+        if progress:
+            _report_progress(len(file_paths), len(file_paths), total_samples, start, final=True)
+    finally:
+        if pool:
+            pool.terminate()
+
+
+def extractor_config():
+    """Everything that changes extracted landmarks/features; part of every feature-store key."""
+    try:
+        mediapipe_version = metadata.version("mediapipe")
+    except metadata.PackageNotFoundError:
+        mediapipe_version = None
+    return {
+        "mediapipe": mediapipe_version,
+        "pose_options": POSE_OPTIONS,
+        "video_sampling": [VIDEO_SAMPLE_FPS, VIDEO_DEDUP_THRESHOLD],
+        "angle_joints": ANGLE_JOINTS.tolist(),
+    }
+
+
+def process_dataset(dataset_path, workers=None, store_path=None):
+    """
+    Builds the feature matrix for every image/video under dataset_path.
+    Results are cached in a content-addressed FeatureStore (default
+    "<dataset_path>_features/", pass False to disable): unchanged files are
+    loaded from its memory-mapped shards and only new or changed files are
+    sent to Mediapipe. The store is flushed every SHARD_SIZE files, so an
+    interrupted run resumes from there.
+    """
+    if store_path is None:
+        store_path = os.path.normpath(dataset_path) + "_features"
+
+    pose_dict, tasks = list_dataset(dataset_path)
+    store = FeatureStore(store_path, extractor_config()) if store_path else None
+
+    keys = {file_path: store.key_for(file_path) for file_path, _ in tasks} if store else {}
+    results = {}
+    if store:
+        for file_path, _ in tasks:
+            cached = store.get(keys[file_path])
+            if cached is not None:
+                results[file_path] = cached[1]
+    pending = [file_path for file_path, _ in tasks if file_path not in results]
+    print(f"{len(tasks) - len(pending)} of {len(tasks)} files cached, extracting {len(pending)}.")
+
+    try:
+        for file_path, samples in extract_dataset(pending, workers):
+            if store:
+                results[file_path] = store.put(keys[file_path], samples)[1]
+            elif samples:
+                results[file_path] = build_features(np.stack(samples))
+    finally:
+        if store:
+            store.close()
+
+    # ✅ Gather the per-file feature rows (cached ones are mmap views) in dataset order
+    features = [results[file_path] for file_path, _ in tasks if file_path in results]
+    labels = [np.full(len(results[file_path]), label) for file_path, label in tasks if file_path in results]
+    if features:
+        X = np.concatenate(features).astype(np.float32, copy=False)
+        y = np.concatenate(labels)
+    else:
+        X = np.empty((0, FEATURE_DIM), dtype=np.float32)
+        y = np.array([], dtype=int)
+    return X, y, pose_dict
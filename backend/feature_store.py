@@ -0,0 +1,137 @@
+# feature_store.py
+# Content-addressed cache of extracted landmarks + feature vectors, so
+# retraining only runs Mediapipe on new or changed files.
+import hashlib
+import json
+import os
+
+import numpy as np
+
+try:
+    from features import build_features, NUM_LANDMARKS, LANDMARK_DIMS, FEATURE_DIM
+except ImportError:
+    from backend.features import build_features, NUM_LANDMARKS, LANDMARK_DIMS, FEATURE_DIM
+
+INDEX_FILE = "index.json"
+SHARD_SIZE = 256          # files per shard; also how often progress is persisted
+_HASH_CHUNK = 1 << 20
+
+
+def config_digest(config):
+    """Stable short hash of the extractor configuration (JSON-serializable dict)."""
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class FeatureStore:
+    """
+    Landmarks (K, 33, 4) and features (K, 138) per source file, keyed by
+    sha256(file content) + extractor config digest. A file with no detected
+    pose is stored with K = 0 so it is not retried.
+
+    Layout under root:
+      index.json                    {key: [shard, start, count]} + file hash cache
+      shard-00000.landmarks.npy     (N, 33, 4) float32
+      shard-00000.features.npy      (N, 138) float32
+    Shards are memory-mapped on read, so cached entries load as zero-copy views.
+    New entries are buffered and written as a new shard every SHARD_SIZE files;
+    the index is replaced atomically afterwards, so a crash loses at most one
+    unflushed shard.
+    """
+
+    def __init__(self, root, config, shard_size=SHARD_SIZE):
+        self.root = root
+        self.config_digest = config_digest(config)
+        self.shard_size = shard_size
+        os.makedirs(root, exist_ok=True)
+
+        index_path = os.path.join(root, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, "r") as f:
+                index = json.load(f)
+        else:
+            index = {}
+        self._shards = index.get("shards", 0)
+        self._entries = index.get("entries", {})
+        self._files = index.get("files", {})     # path -> [size, mtime_ns, sha256]
+        self._mapped = {}
+        self._pending = []                      # (key, landmarks, features)
+
+    # ---- Keys ----
+    def file_digest(self, file_path):
+        """sha256 of the file, reusing the cached hash while size and mtime are unchanged."""
+        stat = os.stat(file_path)
+        cached = self._files.get(file_path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                digest.update(chunk)
+        self._files[file_path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def key_for(self, file_path):
+        return f"{self.file_digest(file_path)}-{self.config_digest}"
+
+    # ---- Reads ----
+    def _shard(self, shard):
+        if shard not in self._mapped:
+            prefix = os.path.join(self.root, f"shard-{shard:05d}")
+            self._mapped[shard] = (
+                np.load(prefix + ".landmarks.npy", mmap_mode="r"),
+                np.load(prefix + ".features.npy", mmap_mode="r"),
+            )
+        return self._mapped[shard]
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """(landmarks, features) views for key, or None if it was never extracted."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        shard, start, count = entry
+        if count == 0:
+            return (np.empty((0, NUM_LANDMARKS, LANDMARK_DIMS), dtype=np.float32),
+                    np.empty((0, FEATURE_DIM), dtype=np.float32))
+        landmarks, features = self._shard(shard)
+        return landmarks[start:start + count], features[start:start + count]
+
+    # ---- Writes ----
+    def put(self, key, samples):
+        """Adds the landmark arrays extracted from one file; returns (landmarks, features)."""
+        landmarks = np.asarray(samples, dtype=np.float32).reshape(-1, NUM_LANDMARKS, LANDMARK_DIMS)
+        features = build_features(landmarks) if len(landmarks) else np.empty((0, FEATURE_DIM), dtype=np.float32)
+        self._pending.append((key, landmarks, features))
+        if len(self._pending) >= self.shard_size:
+            self.flush()
+        return landmarks, features
+
+    def flush(self):
+        if not self._pending:
+            return
+        rows = [(key, lm, ft) for key, lm, ft in self._pending if len(lm)]
+        shard = self._shards
+        if rows:
+            prefix = os.path.join(self.root, f"shard-{shard:05d}")
+            np.save(prefix + ".landmarks.npy", np.concatenate([lm for _, lm, _ in rows]))
+            np.save(prefix + ".features.npy", np.concatenate([ft for _, _, ft in rows]))
+            self._shards += 1
+
+        start = 0
+        for key, landmarks, _ in self._pending:
+            self._entries[key] = [shard if len(landmarks) else -1, start, len(landmarks)]
+            start += len(landmarks)
+        self._pending = []
+        self._write_index()
+
+    def _write_index(self):
+        index_path = os.path.join(self.root, INDEX_FILE)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"shards": self._shards, "entries": self._entries, "files": self._files}, f)
+        os.replace(tmp_path, index_path)
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,116 @@
+# features.py
+# Dense landmark arrays and the hybrid feature vector, shared by training,
+# inference and the feedback rules. Kept numpy-only so it can be imported
+# both as backend.features (serving) and as features (training scripts).
+import numpy as np
+
+NUM_LANDMARKS = 33
+LANDMARK_DIMS = 4            # x, y, z, visibility
+FLAT_DIM = NUM_LANDMARKS * LANDMARK_DIMS
+
+# (a, vertex, c) landmark triples for the angle features, in training order
+ANGLE_JOINTS = np.array([
+    [11, 13, 15],   # left arm
+    [12, 14, 16],   # right arm
+    [23, 25, 27],   # left leg
+    [24, 26, 28],   # right leg
+    [11, 23, 25],   # left hip
+    [12, 24, 26],   # right hip
+])
+FEATURE_DIM = FLAT_DIM + len(ANGLE_JOINTS)
+
+# Wire layout of one NormalizedLandmark inside a serialized NormalizedLandmarkList
+# when x, y, z and visibility are set (presence unset): field tag, length, then four
+# (tag, float32) pairs = 22 bytes. Lets us read the whole list as one byte matrix
+# instead of touching 33 protobuf objects from Python.
+_RECORD_SIZE = 22
+_TAG_OFFSETS = np.array([0, 1, 2, 7, 12, 17])
+_EXPECTED_TAGS = np.array([0x0A, _RECORD_SIZE - 2, 0x0D, 0x15, 0x1D, 0x25], dtype=np.uint8)
+_FLOAT_OFFSETS = np.array([start + i for start in (3, 8, 13, 18) for i in range(4)])
+
+
+def _parse_landmark_list(message):
+    """Decodes a NormalizedLandmarkList straight from its wire bytes, or None if the layout differs."""
+    buf = message.SerializeToString()
+    if not buf or len(buf) % _RECORD_SIZE:
+        return None
+    rows = np.frombuffer(buf, dtype=np.uint8).reshape(-1, _RECORD_SIZE)
+    if not (rows[:, _TAG_OFFSETS] == _EXPECTED_TAGS).all():
+        return None
+    return np.ascontiguousarray(rows[:, _FLOAT_OFFSETS]).view("<f4").astype(np.float32, copy=False)
+
+
+def landmarks_to_array(landmarks):
+    """
+    Converts landmarks to a float32 (33, 4) array of x, y, z, visibility.
+    Accepts a Mediapipe NormalizedLandmarkList (results.pose_landmarks),
+    its .landmark list, a list of landmark-like objects, or an array
+    (flat 132 values, (33, 4), or already batched (N, 33, 4)).
+    """
+    if landmarks is None:
+        return None
+    if isinstance(landmarks, np.ndarray):
+        arr = landmarks.astype(np.float32, copy=False)
+        return arr.reshape(-1, LANDMARK_DIMS) if arr.ndim == 1 else arr
+    if hasattr(landmarks, "SerializeToString") and hasattr(landmarks, "landmark"):
+        arr = _parse_landmark_list(landmarks)
+        if arr is not None:
+            return arr
+        landmarks = landmarks.landmark
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float32)
+
+
+# Packed wire formats accepted from clients that run Mediapipe themselves
+PACKED_DTYPES = {"float32": np.dtype("<f4"), "float16": np.dtype("<f2")}
+
+
+def landmarks_from_bytes(buffer, dtype=None):
+    """
+    Decodes a packed little-endian (33, 4) landmark payload (x, y, z, visibility
+    per landmark). dtype is "float32" or "float16"; if omitted it is inferred
+    from the payload size. Raises ValueError on malformed or non-finite data.
+    """
+    if dtype is None:
+        dtype = next((name for name, dt in PACKED_DTYPES.items()
+                      if len(buffer) == FLAT_DIM * dt.itemsize), None)
+    if dtype not in PACKED_DTYPES:
+        raise ValueError(f"Expected {FLAT_DIM} float32 or float16 values, got {len(buffer)} bytes")
+    packed = PACKED_DTYPES[dtype]
+    if len(buffer) != FLAT_DIM * packed.itemsize:
+        raise ValueError(f"Expected {FLAT_DIM * packed.itemsize} bytes of {dtype}, got {len(buffer)}")
+    return validate_landmarks(np.frombuffer(buffer, dtype=packed))
+
+
+def validate_landmarks(values):
+    """Checks client-supplied landmarks (132 values or (33, 4)) and returns a float32 (33, 4) array."""
+    arr = np.asarray(values, dtype=np.float32)
+    if arr.size != FLAT_DIM:
+        raise ValueError(f"Expected {NUM_LANDMARKS}x{LANDMARK_DIMS} landmark values, got {arr.size}")
+    if not np.isfinite(arr).all():
+        raise ValueError("Landmarks must be finite numbers")
+    return arr.reshape(NUM_LANDMARKS, LANDMARK_DIMS)
+
+
+def joint_angles(landmarks, joints=ANGLE_JOINTS):
+    """
+    Angles in degrees at the vertex of each (a, vertex, c) triple, from x/y only.
+    landmarks: (33, 4) or (N, 33, 4) → (len(joints),) or (N, len(joints))
+    """
+    xy = np.asarray(landmarks, dtype=np.float64)[..., :2]
+    a = xy[..., joints[:, 0], :]
+    b = xy[..., joints[:, 1], :]
+    c = xy[..., joints[:, 2], :]
+    ba = a - b
+    bc = c - b
+    cosine = np.einsum("...ij,...ij->...i", ba, bc) / (
+        np.linalg.norm(ba, axis=-1) * np.linalg.norm(bc, axis=-1) + 1e-6
+    )
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+
+def build_features(landmarks):
+    """Hybrid vectors [landmarks + angles]: (33, 4) → (138,), (N, 33, 4) → (N, 138), float32."""
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    flat = landmarks.reshape(landmarks.shape[:-2] + (FLAT_DIM,))
+    angles = joint_angles(landmarks).astype(np.float32)
+    return np.concatenate([flat, angles], axis=-1)
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Largest x/y landmark movement (normalized image units) still treated as "same pose"
+MOVEMENT_THRESHOLD = float(os.getenv("POSE_CACHE_THRESHOLD", "0.01"))
+MAX_SESSIONS = int(os.getenv("POSE_CACHE_MAX_SESSIONS", "4096"))
+IDLE_TIMEOUT = float(os.getenv("POSE_CACHE_IDLE_TIMEOUT", "60"))   # seconds
+MAX_AGE = float(os.getenv("POSE_CACHE_MAX_AGE", "2"))              # recompute at least this often
+
+
+class _Entry:
+    __slots__ = ("pose_name", "landmarks", "result", "computed_at", "last_used")
+
+    def __init__(self, pose_name, landmarks, result, now):
+        self.pose_name = pose_name
+        self.landmarks = landmarks
+        self.result = result
+        self.computed_at = now
+        self.last_used = now
+
+
+class FrameDeltaCache:
+    """
+    Remembers the last classification + feedback per session (user or live
+    session id). A new frame whose landmarks moved less than the threshold
+    from the frame that produced the cached result reuses it.
+
+    Comparing against the frame that was actually computed (not the previous
+    frame) keeps slow drifts from being cached forever. Memory is bounded by
+    an LRU of max_sessions entries; idle sessions are evicted.
+    """
+
+    def __init__(self, threshold=MOVEMENT_THRESHOLD, max_sessions=MAX_SESSIONS,
+                 idle_timeout=IDLE_TIMEOUT, max_age=MAX_AGE):
+        self.threshold = threshold
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.threshold > 0 and self.max_sessions > 0
+
+    def _evict_idle(self, now):
+        # Entries are kept in least-recently-used order, so idle ones are at the front
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry.last_used <= self.idle_timeout:
+                break
+            del self._entries[key]
+
+    def lookup(self, key, pose_name, landmarks):
+        """Returns the cached (pose_class, feedback) if the pose barely moved, else None."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(key)
+            if (entry is None or entry.pose_name != pose_name
+                    or now - entry.computed_at > self.max_age):
+                self.misses += 1
+                return None
+
+            movement = np.abs(landmarks[:, :2] - entry.landmarks[:, :2]).max()
+            if movement > self.threshold:
+                self.misses += 1
+                return None
+
+            entry.last_used = now
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.result
+
+    def store(self, key, pose_name, landmarks, result):
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = _Entry(pose_name, np.array(landmarks, dtype=np.float32), result, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+frame_cache = FrameDeltaCache()
@@ -0,0 +1,188 @@
+"""
+Versioned model registry: each version is a directory holding one model file
+(Keras .h5 or compact .npz) and its class map; a CURRENT file names the
+version workers should serve.
+
+    <root>/CURRENT                    "20261018-120000"
+    <root>/versions/<version>/model.npz (or model.h5)
+    <root>/versions/<version>/classes.json
+
+Versions appear with a directory rename and CURRENT is replaced with
+os.replace, so a worker never sees a half-written bundle or pointer.
+
+    python -m backend.model_registry publish --registry models \\
+        --model backend/yoga_pose_model.npz --classes backend/yoga_poses_classes.json
+    python -m backend.model_registry activate --registry models --version 20261011-120000
+    python -m backend.model_registry list --registry models
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+CLASSES_FILE = "classes.json"
+MODEL_FILES = ("model.npz", "model.h5")
+POLL_SECONDS = float(os.getenv("POSE_MODEL_POLL_SECONDS", "5"))
+
+
+def version_dir(root, version):
+    return os.path.join(root, VERSIONS_DIR, version)
+
+
+def list_versions(root):
+    versions_root = os.path.join(root, VERSIONS_DIR)
+    if not os.path.isdir(versions_root):
+        return []
+    return sorted(name for name in os.listdir(versions_root) if not name.startswith("."))
+
+
+def current_version(root):
+    """The version CURRENT points at, or None before the first activation."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def bundle_paths(root, version):
+    """(model_path, classes_path) of a published version."""
+    directory = version_dir(root, version)
+    for name in MODEL_FILES:
+        model_path = os.path.join(directory, name)
+        if os.path.exists(model_path):
+            return model_path, os.path.join(directory, CLASSES_FILE)
+    raise FileNotFoundError(f"No model file in {directory}")
+
+
+def activate(root, version):
+    """Points CURRENT at an already published version (also used for rollbacks)."""
+    bundle_paths(root, version)    # refuse to point at a missing or incomplete version
+    tmp_path = os.path.join(root, CURRENT_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+    logging.info(f"Model registry {root}: CURRENT -> {version}")
+
+
+def publish(root, model_path, classes_path, version=None, make_current=True):
+    """Copies a model + class map into a new version directory; returns the version."""
+    extension = os.path.splitext(model_path)[1].lower()
+    if "model" + extension not in MODEL_FILES:
+        raise ValueError(f"Unsupported model file: {model_path}")
+    with open(classes_path) as f:
+        json.load(f)    # fail before publishing an unreadable class map
+
+    version = version or time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+    target = version_dir(root, version)
+    if os.path.exists(target):
+        raise FileExistsError(f"Version {version} already exists in {root}")
+
+    staging = os.path.join(root, VERSIONS_DIR, f".{version}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    shutil.copyfile(model_path, os.path.join(staging, "model" + extension))
+    shutil.copyfile(classes_path, os.path.join(staging, CLASSES_FILE))
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump({"version": version, "source": os.path.abspath(model_path), "published_at": time.time()}, f)
+    os.rename(staging, target)
+
+    if make_current:
+        activate(root, version)
+    return version
+
+
+class RegistryWatcher:
+    """
+    Polls CURRENT and calls on_change(version) from a background thread when
+    it names a version other than the one being served. on_change should
+    load, warm and swap in the new model, and raise if it cannot; a version
+    that failed is not retried until CURRENT changes again.
+
+    serving_version, if given, is asked for the version actually served on
+    every poll (None while the first load is still running, which skips the
+    poll), so the watcher can't assume a version that was never loaded.
+    """
+
+    def __init__(self, root, on_change, loaded_version=None, interval=POLL_SECONDS, serving_version=None):
+        self.root = root
+        self.on_change = on_change
+        self.loaded_version = loaded_version
+        self.serving_version = serving_version
+        self.interval = interval
+        self._failed_version = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="model-registry-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self):
+        """One poll; returns True if a new version was swapped in."""
+        if self.serving_version is not None:
+            serving = self.serving_version()
+            if serving is None:
+                return False
+            self.loaded_version = serving
+        version = current_version(self.root)
+        if version is None or version in (self.loaded_version, self._failed_version):
+            return False
+        try:
+            self.on_change(version)
+        except Exception as e:
+            self._failed_version = version
+            logging.error(f"Could not load model version {version}, still serving {self.loaded_version}: {e}")
+            return False
+        self.loaded_version = version
+        self._failed_version = None
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the versioned pose model registry.")
+    parser.add_argument("--registry", default=os.getenv("POSE_MODEL_REGISTRY", "models"))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    publish_cmd = commands.add_parser("publish", help="add a model + class map as a new version")
+    publish_cmd.add_argument("--model", required=True, help=".h5 or compact .npz model")
+    publish_cmd.add_argument("--classes", required=True, help="class map JSON")
+    publish_cmd.add_argument("--version", help="version name (default: UTC timestamp)")
+    publish_cmd.add_argument("--no-activate", action="store_true", help="publish without moving CURRENT")
+
+    activate_cmd = commands.add_parser("activate", help="point CURRENT at a published version")
+    activate_cmd.add_argument("--version", required=True)
+
+    commands.add_parser("list", help="list published versions")
+    args = parser.parse_args(argv)
+
+    if args.command == "publish":
+        version = publish(args.registry, args.model, args.classes, args.version, not args.no_activate)
+        print(f"Published {version}" + ("" if args.no_activate else " (current)"))
+    elif args.command == "activate":
+        activate(args.registry, args.version)
+        print(f"CURRENT -> {args.version}")
+    else:
+        current = current_version(args.registry)
+        for version in list_versions(args.registry):
+            print(("* " if version == current else "  ") + version)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,42 @@
 # model_trainer.py
 from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, Dropout
+from tensorflow.keras.layers import Dense, Dropout, Input
+from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.utils import to_categorical
 from sklearn.model_selection import train_test_split
 
-def create_model(input_shape, num_classes):
-    model = Sequential([
-        Dense(128, input_shape=(input_shape,), activation='relu'),
-        Dropout(0.2),
-        Dense(64, activation='relu'),
-        Dropout(0.2),
-        Dense(num_classes, activation='softmax')
-    ])
+try:
+    from augmentation import augment_features
+except ImportError:
+    from backend.augmentation import augment_features
+
+def create_model(input_shape, num_classes, hidden_units=(128, 64), dropout=0.2, learning_rate=0.001):
+    layers = [Input(shape=(input_shape,))]
+    for units in hidden_units:
+        layers += [Dense(units, activation='relu'), Dropout(dropout)]
+    layers.append(Dense(num_classes, activation='softmax'))
+    model = Sequential(layers)
     
     model.compile(
-        optimizer='adam',
+        optimizer=Adam(learning_rate=learning_rate),
         loss='categorical_crossentropy',
         metrics=['accuracy']
     )
     
     return model
 
-def train_yoga_model(X, y, pose_dict, test_size=0.2, epochs=50, batch_size=32):
+def train_yoga_model(X, y, pose_dict, test_size=0.2, epochs=50, batch_size=32, augment_copies=0,
+                     augment_params=None):
     num_classes = len(pose_dict)
     
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
     
+    # Augment after the split so the test set only holds real samples
+    if augment_copies:
+        X_train, y_train = augment_features(X_train, y_train, copies=augment_copies, rng=42,
+                                            **(augment_params or {}))
+        print(f"Augmented training set to {len(X_train)} samples ({augment_copies} copies per sample).")
+    
     y_train_categorical = to_categorical(y_train, num_classes=num_classes)
     y_test_categorical = to_categorical(y_test, num_classes=num_classes)
     
@@ -0,0 +1,253 @@
+import argparse
+import json
+import logging
+import sys
+
+import h5py
+import numpy as np
+
+
+def _relu(x):
+    return np.maximum(x, 0.0, out=x)
+
+
+def _softmax(x):
+    x = x - x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+ACTIVATIONS = {
+    "relu": _relu,
+    "softmax": _softmax,
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+    "linear": lambda x: x,
+}
+
+# Layers that are the identity at inference time
+PASSTHROUGH_LAYERS = {"InputLayer", "Dropout"}
+
+# Compact inference-only export (.npz): per-layer weights + activations + class map
+NPZ_FORMAT = "prana-mlp-1"
+EXPORT_DTYPES = ("float32", "float16", "int8")
+
+# Parity gates against Keras, measured on the bundled model over 5 x 5000 random inputs:
+# float32 differs by at most ~3e-7; int8 by up to ~0.046 in probability, which says
+# little on its own, so int8 is judged on the predicted class (0.9976-0.9994 agreement)
+FLOAT32_ATOL = 1e-4
+INT8_MIN_AGREEMENT = 0.99
+
+
+def quantize_int8(kernel):
+    """Symmetric per-output-channel int8 quantization → (int8 kernel, float32 scales)."""
+    max_abs = np.abs(kernel).max(axis=0)
+    scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+    q = np.clip(np.round(kernel / scale), -127, 127).astype(np.int8)
+    return q, scale
+
+
+class DenseLayer:
+    """
+    One Dense layer. With int8 weights the kernel is kept as its integer
+    values (in float32 so the matmul stays on BLAS) and each output column
+    is rescaled afterwards, i.e. x @ (q * s) == (x @ q) * s.
+    """
+
+    def __init__(self, kernel, bias, activation, scale=None):
+        self.kernel = np.ascontiguousarray(kernel, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float32)
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation: {activation}")
+        self.activation = activation
+        self._activation_fn = ACTIVATIONS[activation]
+
+    def __call__(self, x):
+        out = x @ self.kernel
+        if self.scale is not None:
+            out *= self.scale
+        out += self.bias
+        return self._activation_fn(out)
+
+
+class NumpyPoseModel:
+    """
+    Forward pass of the pose MLP (Dense/Dropout stack from create_model)
+    in plain NumPy. Drop-in for the Keras model's predict().
+    """
+
+    def __init__(self, layers, class_names=None):
+        self.layers = layers
+        self.class_names = class_names    # {"0": "pose", ...} when loaded from a compact export
+
+    @property
+    def input_dim(self):
+        return self.layers[0].kernel.shape[0]
+
+    @property
+    def input_shape(self):
+        """Same shape convention as the Keras model: (None, features)."""
+        return (None, self.input_dim)
+
+    @classmethod
+    def from_h5(cls, path, quantize=None):
+        """
+        Reads layer config and weights from a Keras .h5 file (no TensorFlow needed).
+        quantize: None for float32 weights, "int8" for per-channel int8 weights.
+        """
+        if quantize not in (None, "int8"):
+            raise ValueError(f"Unsupported quantization: {quantize}")
+
+        layers = []
+        with h5py.File(path, "r") as f:
+            config = json.loads(f.attrs["model_config"])
+            weights_root = f["model_weights"]
+
+            for layer in config["config"]["layers"]:
+                class_name = layer["class_name"]
+                if class_name in PASSTHROUGH_LAYERS:
+                    continue
+                if class_name != "Dense":
+                    raise ValueError(f"Unsupported layer for NumPy inference: {class_name}")
+
+                layer_cfg = layer["config"]
+                group = weights_root[layer_cfg["name"]]
+                weights = {}
+                for weight_name in group.attrs["weight_names"]:
+                    if isinstance(weight_name, bytes):
+                        weight_name = weight_name.decode()
+                    # "sequential/dense/kernel" (Keras 3) or "dense/kernel:0" (Keras 2)
+                    key = weight_name.split("/")[-1].split(":")[0]
+                    weights[key] = group[weight_name][()]
+
+                kernel = weights["kernel"].astype(np.float32)
+                bias = weights.get("bias", np.zeros(kernel.shape[1], dtype=np.float32))
+                scale = None
+                if quantize == "int8":
+                    kernel, scale = quantize_int8(kernel)
+                layers.append(DenseLayer(kernel, bias, layer_cfg.get("activation", "linear"), scale))
+
+        if not layers:
+            raise ValueError(f"No Dense layers found in {path}")
+        logging.info(f"Loaded NumPy pose model from {path} ({len(layers)} dense layers, quantize={quantize})")
+        return cls(layers)
+
+    @classmethod
+    def from_keras(cls, model, quantize=None):
+        """Copies the weights of an in-memory Keras model (e.g. right after training)."""
+        if quantize not in (None, "int8"):
+            raise ValueError(f"Unsupported quantization: {quantize}")
+
+        layers = []
+        for layer in model.layers:
+            class_name = type(layer).__name__
+            if class_name in PASSTHROUGH_LAYERS:
+                continue
+            if class_name != "Dense":
+                raise ValueError(f"Unsupported layer for NumPy inference: {class_name}")
+            weights = [np.asarray(w, dtype=np.float32) for w in layer.get_weights()]
+            kernel = weights[0]
+            bias = weights[1] if len(weights) > 1 else np.zeros(kernel.shape[1], dtype=np.float32)
+            scale = None
+            if quantize == "int8":
+                kernel, scale = quantize_int8(kernel)
+            layers.append(DenseLayer(kernel, bias, layer.get_config().get("activation", "linear"), scale))
+        return cls(layers)
+
+    @classmethod
+    def from_npz(cls, path):
+        """Loads a compact export written by save_npz (float16 weights are widened to float32)."""
+        with np.load(path, allow_pickle=False) as f:
+            if str(f["format"]) != NPZ_FORMAT:
+                raise ValueError(f"{path} is not a {NPZ_FORMAT} export")
+            layers = []
+            for i, activation in enumerate(f["activations"]):
+                scale = f[f"scale_{i}"] if f"scale_{i}" in f else None
+                layers.append(DenseLayer(f[f"kernel_{i}"], f[f"bias_{i}"], str(activation), scale))
+            class_names = json.loads(str(f["class_names"])) if "class_names" in f else None
+        logging.info(f"Loaded compact pose model from {path} ({len(layers)} dense layers)")
+        return cls(layers, class_names)
+
+    def save_npz(self, path, dtype="float32", class_names=None):
+        """
+        Writes weights only (no optimizer state or graph) as an .npz:
+        kernels in dtype ("float32", "float16" or per-channel "int8"),
+        biases and int8 scales in float32, plus the class map.
+        """
+        if dtype not in EXPORT_DTYPES:
+            raise ValueError(f"Unsupported export dtype: {dtype}")
+        arrays = {
+            "format": np.array(NPZ_FORMAT),
+            "activations": np.array([layer.activation for layer in self.layers]),
+        }
+        class_names = class_names if class_names is not None else self.class_names
+        if class_names is not None:
+            arrays["class_names"] = np.array(json.dumps(class_names))
+        for i, layer in enumerate(self.layers):
+            kernel = layer.kernel if layer.scale is None else layer.kernel * layer.scale
+            if dtype == "int8":
+                arrays[f"kernel_{i}"], arrays[f"scale_{i}"] = quantize_int8(kernel)
+            else:
+                arrays[f"kernel_{i}"] = kernel.astype(dtype)
+            arrays[f"bias_{i}"] = layer.bias
+        with open(path, "wb") as f:   # file object: np.savez would append .npz to other names
+            np.savez(f, **arrays)
+
+    def predict(self, x, verbose=0):
+        """x: (N, D) features → (N, num_classes) probabilities (verbose kept for Keras parity)."""
+        out = np.asarray(x, dtype=np.float32)
+        if out.ndim == 1:
+            out = out[np.newaxis, :]
+        for layer in self.layers:
+            out = layer(out)
+        return out
+
+
+def check_parity(path, samples=1000, quantize=None, seed=0):
+    """Compares NumPy and Keras outputs on random inputs; returns (max_abs_diff, argmax_agreement)."""
+    import tensorflow as tf
+
+    keras_model = tf.keras.models.load_model(path)
+    numpy_model = NumpyPoseModel.from_h5(path, quantize=quantize)
+
+    rng = np.random.default_rng(seed)
+    dim = numpy_model.input_dim
+    # Landmark-like values in [0, 1] plus angle-like values in [0, 180]
+    x = rng.random((samples, dim), dtype=np.float32)
+    x[:, -6:] *= 180.0
+
+    expected = keras_model.predict(x, verbose=0)
+    actual = numpy_model.predict(x)
+    max_diff = float(np.abs(expected - actual).max())
+    agreement = float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1)))
+    print(f"max |keras - numpy| = {max_diff:.2e}, argmax agreement = {agreement:.4f}")
+    return max_diff, agreement
+
+
+def parity_ok(max_diff, agreement, quantize=None, atol=None):
+    """float32 must match closely and agree on every sample; int8 must agree on the class."""
+    if quantize == "int8":
+        return agreement >= INT8_MIN_AGREEMENT and (atol is None or max_diff <= atol)
+    return max_diff <= (FLOAT32_ATOL if atol is None else atol) and agreement == 1.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check NumPy inference against Keras.")
+    parser.add_argument("--model", default="backend/yoga_pose_model.h5")
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("--int8", action="store_true", help="check the int8-quantized weights")
+    parser.add_argument("--atol", type=float, default=None,
+                        help=f"max |keras - numpy| (default {FLOAT32_ATOL} for float32, unchecked for int8)")
+    args = parser.parse_args()
+
+    quantize = "int8" if args.int8 else None
+    max_diff, agreement = check_parity(args.model, args.samples, quantize)
+    ok = parity_ok(max_diff, agreement, quantize, args.atol)
+    print("PARITY OK" if ok else "PARITY FAILED")
+    sys.exit(0 if ok else 1)
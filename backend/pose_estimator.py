@@ -1,55 +1,219 @@
-import mediapipe as mp
+import logging
+import threading
 import numpy as np
 import cv2  # for preprocessing
+from backend.features import landmarks_to_array
+from readiness import register
+from telemetry import STAGE_LATENCY
 
-# Initialize Mediapipe pose detector
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose(
-    static_image_mode=True,
-    model_complexity=2,              # higher accuracy
-    min_detection_confidence=0.3,    # lower threshold for tough lighting
-    min_tracking_confidence=0.3
-)
 
-def preprocess_frame(image_bgr):
-    """Normalize brightness/contrast to help Mediapipe in variable lighting."""
-    # Convert to YUV and equalize histogram of Y (luminance) channel
-    yuv = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2YUV)
-    yuv[:, :, 0] = cv2.equalizeHist(yuv[:, :, 0])
-    normalized = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR)
+def create_pose(**kwargs):
+    """Builds a Mediapipe Pose instance (Mediapipe is imported on first use)."""
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(**kwargs)
+
+
+def _load_pose():
+    # Initialize Mediapipe pose detector
+    return create_pose(
+        static_image_mode=True,
+        model_complexity=2,              # higher accuracy
+        min_detection_confidence=0.3,    # lower threshold for tough lighting
+        min_tracking_confidence=0.3
+    )
+
+
+def _warm_pose(detector):
+    detector.process(np.zeros((480, 640, 3), dtype=np.uint8))
+
+
+# Shared static-image detector, loaded on first frame or by the app's warmup.
+# A Mediapipe graph must not run two frames at once, so calls are serialized.
+pose = register("mediapipe", _load_pose, warmup=_warm_pose)
+_pose_lock = threading.Lock()
+
+
+# Mediapipe input size (helps detection stability)
+FRAME_WIDTH, FRAME_HEIGHT = 640, 480
+DARK_THRESHOLD = 60        # mean brightness below which frames get boosted
+TARGET_BRIGHTNESS = 120.0
+
+# ROI cropping (streaming sessions): margin around the last person box, and
+# how far inside the current crop the person must stay before it is recomputed
+ROI_MARGIN = 0.3
+ROI_KEEP_INSET = 0.1
+ROI_MIN_VISIBLE = 8
+
+
+class FramePreprocessor:
+    """
+    Lighting normalization + resize for Mediapipe, writing into buffers that
+    are reused from frame to frame.
+
+    Per frame: [crop to ROI] → resize → BGR→YUV → equalize Y → YUV→RGB
+    (one conversion straight to Mediapipe's RGB) → brightness boost via a
+    256-entry lookup table for dark frames. Equalizing after the resize
+    works on 640x480 pixels instead of the full camera frame.
+
+    With track_roi=True the preprocessor remembers the person's bounding box
+    and crops the next frame to it before resizing, so Mediapipe gets more
+    pixels on the person. Not thread-safe: use one instance per thread/session.
+    """
+
+    def __init__(self, track_roi=False, size=(FRAME_WIDTH, FRAME_HEIGHT)):
+        self.track_roi = track_roi
+        self.size = size
+        width, height = size
+        self._resized = np.empty((height, width, 3), dtype=np.uint8)
+        self._yuv = np.empty((height, width, 3), dtype=np.uint8)
+        self._luma = np.empty((height, width), dtype=np.uint8)
+        self._rgb = np.empty((height, width, 3), dtype=np.uint8)
+        self._lut = np.empty(256, dtype=np.uint8)
+        self._levels = np.arange(256, dtype=np.float64)
+        self._scaled = np.empty(256, dtype=np.float64)
+        self.roi = None       # (x0, y0, w, h) in pixels of the last frame size
+        self._frame_shape = None
+
+    def process(self, image_bgr):
+        """Returns (RGB frame for Mediapipe, crop (x0, y0, w, h) in source pixels or None)."""
+        if image_bgr.shape[:2] != self._frame_shape:
+            self._frame_shape = image_bgr.shape[:2]
+            self.roi = None
+
+        crop = self.roi
+        source = image_bgr
+        if crop is not None:
+            x0, y0, w, h = crop
+            source = image_bgr[y0:y0 + h, x0:x0 + w]
 
-    # Resize to consistent size (helps detection stability)
-    normalized = cv2.resize(normalized, (640, 480))
+        cv2.resize(source, self.size, dst=self._resized)
+        cv2.cvtColor(self._resized, cv2.COLOR_BGR2YUV, dst=self._yuv)
+        cv2.extractChannel(self._yuv, 0, dst=self._luma)
+        cv2.equalizeHist(self._luma, dst=self._luma)
+        cv2.insertChannel(self._luma, self._yuv, 0)
+        cv2.cvtColor(self._yuv, cv2.COLOR_YUV2RGB, dst=self._rgb)
 
-    # Optional: auto brightness boost if frame is too dark
-    mean_brightness = np.mean(normalized)
-    if mean_brightness < 60:  # adjust threshold if needed
-        factor = 120.0 / (mean_brightness + 1e-6)
-        normalized = np.clip(normalized * factor, 0, 255).astype(np.uint8)
+        # Auto brightness boost if frame is too dark (same scaling as before, as a LUT)
+        mean_brightness = sum(cv2.mean(self._rgb)[:3]) / 3.0
+        if mean_brightness < DARK_THRESHOLD:
+            factor = TARGET_BRIGHTNESS / (mean_brightness + 1e-6)
+            np.multiply(self._levels, factor, out=self._scaled)
+            np.clip(self._scaled, 0, 255, out=self._scaled)
+            self._lut[:] = self._scaled
+            cv2.LUT(self._rgb, self._lut, dst=self._rgb)
+
+        return self._rgb, crop
+
+    def to_frame_coords(self, landmarks, crop):
+        """Maps landmarks normalized to the crop back to full-frame normalized coords (in place)."""
+        if crop is None:
+            return landmarks
+        height, width = self._frame_shape
+        x0, y0, w, h = crop
+        landmarks[:, 0] = (landmarks[:, 0] * w + x0) / width
+        landmarks[:, 1] = (landmarks[:, 1] * h + y0) / height
+        landmarks[:, 2] *= w / width
+        return landmarks
+
+    def update_roi(self, landmarks):
+        """Chooses the crop for the next frame from this frame's full-frame landmarks."""
+        if not self.track_roi or self._frame_shape is None:
+            return
+        if landmarks is None:
+            self.roi = None
+            return
+
+        visible = landmarks[landmarks[:, 3] > 0.5, :2]
+        if len(visible) < ROI_MIN_VISIBLE:
+            self.roi = None
+            return
+
+        height, width = self._frame_shape
+        bx0, by0 = visible.min(axis=0) * (width, height)
+        bx1, by1 = visible.max(axis=0) * (width, height)
+
+        # Keep the current crop while the person stays well inside it
+        if self.roi is not None:
+            x0, y0, w, h = self.roi
+            inset_x, inset_y = w * ROI_KEEP_INSET, h * ROI_KEEP_INSET
+            if (bx0 >= x0 + inset_x and by0 >= y0 + inset_y and
+                    bx1 <= x0 + w - inset_x and by1 <= y0 + h - inset_y and
+                    (bx1 - bx0) * (by1 - by0) > 0.25 * w * h):
+                return
+
+        # Box + margin, grown to the Mediapipe input aspect ratio, clamped to the frame
+        box_w = (bx1 - bx0) * (1 + 2 * ROI_MARGIN)
+        box_h = (by1 - by0) * (1 + 2 * ROI_MARGIN)
+        aspect = self.size[0] / self.size[1]
+        box_w, box_h = max(box_w, box_h * aspect), max(box_h, box_w / aspect)
+        if box_w >= 0.9 * width or box_h >= 0.9 * height:
+            self.roi = None   # person fills the frame: cropping gains nothing
+            return
+
+        w, h = int(box_w), int(box_h)
+        x0 = int(min(max((bx0 + bx1 - w) / 2, 0), width - w))
+        y0 = int(min(max((by0 + by1 - h) / 2, 0), height - h))
+        self.roi = (x0, y0, w, h)
+
+
+_local = threading.local()
+
+
+def _thread_preprocessor():
+    """Per-thread preprocessor (and buffers) for the shared static-image path."""
+    preprocessor = getattr(_local, "preprocessor", None)
+    if preprocessor is None:
+        preprocessor = _local.preprocessor = FramePreprocessor()
+    return preprocessor
+
+
+def preprocess_frame_rgb(image_bgr):
+    """
+    Normalize brightness/contrast to help Mediapipe in variable lighting;
+    returns the 640x480 RGB frame Mediapipe takes (what extract_landmarks
+    uses). The array is this thread's reused buffer, overwritten by its next call.
+    """
+    return _thread_preprocessor().process(image_bgr)[0]
+
+
+def preprocess_frame(image_bgr):
+    """Normalize brightness/contrast to help Mediapipe in variable lighting; returns a new 640x480 BGR frame."""
+    return cv2.cvtColor(preprocess_frame_rgb(image_bgr), cv2.COLOR_RGB2BGR)
 
-    return normalized
 
-def extract_landmarks(image):
-    """Extracts flattened + structured landmarks from an input BGR frame."""
-    # Step 1: Preprocess for consistent lighting
-    image_bgr = preprocess_frame(image)
+def extract_landmarks(image, tracker=None, preprocessor=None):
+    """
+    Extracts landmarks from an input BGR frame as (flat (132,), array (33, 4)),
+    both float32 views of the same x, y, z, visibility data.
+    tracker: optional Mediapipe Pose instance (e.g. a streaming session's
+    video-mode tracker); defaults to the shared static-image detector.
+    preprocessor: optional FramePreprocessor (e.g. one that tracks the
+    person's ROI across a session's frames); defaults to a per-thread one.
+    """
+    # Step 1: Preprocess for consistent lighting (straight to RGB for Mediapipe)
+    preprocessor = preprocessor or _thread_preprocessor()
+    with STAGE_LATENCY.time("preprocess"):
+        image_rgb, crop = preprocessor.process(image)
 
-    # Step 2: Convert to RGB for Mediapipe
-    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-    results = pose.process(image_rgb)
+    # Step 2: Run Mediapipe
+    with STAGE_LATENCY.time("mediapipe"):
+        if tracker is not None:
+            results = tracker.process(image_rgb)
+        else:
+            detector = pose.get()
+            with _pose_lock:
+                results = detector.process(image_rgb)
 
     # Step 3: Handle detection failure
     if not results.pose_landmarks:
-        print("⚠️ No pose detected after preprocessing.")
+        preprocessor.update_roi(None)
+        logging.debug("No pose detected after preprocessing.")
         return None, None
 
-    # Step 4: Extract landmarks
-    landmarks = results.pose_landmarks.landmark
-    flat_landmarks = []
-    for lm in landmarks:
-        flat_landmarks.extend([lm.x, lm.y, lm.z, lm.visibility])
+    # Step 4: Extract landmarks (one conversion to a dense array, in full-frame coords)
+    landmarks = preprocessor.to_frame_coords(landmarks_to_array(results.pose_landmarks), crop)
+    preprocessor.update_roi(landmarks)
 
-    print(f"✅ Pose detected: {len(landmarks)} landmarks extracted.")
-    print(f"   Nose (id=0) coords: x={landmarks[0].x:.3f}, y={landmarks[0].y:.3f}, vis={landmarks[0].visibility:.2f}")
+    logging.debug(f"Pose detected: nose x={landmarks[0, 0]:.3f}, y={landmarks[0, 1]:.3f}, vis={landmarks[0, 3]:.2f}")
 
-    return np.array(flat_landmarks), landmarks
+    return landmarks.reshape(-1), landmarks
@@ -0,0 +1,169 @@
+import logging
+import os
+import threading
+import time
+import uuid
+
+from backend.pose_estimator import FramePreprocessor, create_pose, extract_landmarks
+
+# Complexity 0 = lite, 1 = full, 2 = heavy
+MIN_COMPLEXITY = 0
+MAX_COMPLEXITY = 2
+DEFAULT_COMPLEXITY = 1
+
+SESSION_IDLE_TIMEOUT = float(os.getenv("POSE_SESSION_IDLE_TIMEOUT", "120"))  # seconds
+MAX_SESSIONS = int(os.getenv("POSE_MAX_SESSIONS", "64"))
+
+# Latency adaptation
+LATENCY_EMA_ALPHA = 0.2
+ADAPT_MIN_FRAMES = 10      # frames to observe before changing complexity again
+UPGRADE_HEADROOM = 3.0     # next level up is assumed to cost ~3x the current one
+
+
+class PoseSession:
+    """
+    One live-camera session with its own video-mode Mediapipe tracker.
+    Tracking mode lets Mediapipe reuse the previous frame's ROI instead of
+    running person detection on every frame; the session's preprocessor also
+    crops frames to the person before they are downscaled to 640x480.
+    """
+
+    def __init__(self, owner, latency_budget_ms=None, model_complexity=None):
+        self.session_id = uuid.uuid4().hex
+        self.owner = owner
+        self.latency_budget_ms = latency_budget_ms
+        # An explicit complexity pins the session; otherwise adapt to the budget
+        self.adaptive = model_complexity is None and latency_budget_ms is not None
+        self.model_complexity = DEFAULT_COMPLEXITY if model_complexity is None else model_complexity
+        self.latency_ema_ms = None
+        self.frames = 0
+        self._frames_since_change = 0
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+        self.tracker = self._build_tracker()
+        self.preprocessor = FramePreprocessor(track_roi=True)
+
+    def _build_tracker(self):
+        return create_pose(
+            static_image_mode=False,         # video mode → track between frames
+            model_complexity=self.model_complexity,
+            smooth_landmarks=True,
+            min_detection_confidence=0.3,
+            min_tracking_confidence=0.3
+        )
+
+    def process(self, image):
+        """Runs the session tracker on one BGR frame; same return as extract_landmarks."""
+        with self._lock:
+            start = time.perf_counter()
+            flat, landmarks = extract_landmarks(image, tracker=self.tracker, preprocessor=self.preprocessor)
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+            self.frames += 1
+            self.last_used = time.monotonic()
+            self._record_latency(elapsed_ms)
+            return flat, landmarks
+
+    def _record_latency(self, elapsed_ms):
+        if self.latency_ema_ms is None:
+            self.latency_ema_ms = elapsed_ms
+        else:
+            self.latency_ema_ms += LATENCY_EMA_ALPHA * (elapsed_ms - self.latency_ema_ms)
+        self._frames_since_change += 1
+
+        if not self.adaptive or self._frames_since_change < ADAPT_MIN_FRAMES:
+            return
+
+        budget = self.latency_budget_ms
+        if self.latency_ema_ms > budget and self.model_complexity > MIN_COMPLEXITY:
+            self._set_complexity(self.model_complexity - 1)
+        elif (self.latency_ema_ms * UPGRADE_HEADROOM < budget
+              and self.model_complexity < MAX_COMPLEXITY):
+            self._set_complexity(self.model_complexity + 1)
+
+    def _set_complexity(self, complexity):
+        logging.info(
+            f"Session {self.session_id}: complexity {self.model_complexity} → {complexity} "
+            f"(latency {self.latency_ema_ms:.1f} ms, budget {self.latency_budget_ms} ms)"
+        )
+        self.tracker.close()
+        self.model_complexity = complexity
+        self.tracker = self._build_tracker()
+        self.latency_ema_ms = None
+        self._frames_since_change = 0
+
+    def close(self):
+        with self._lock:
+            self.tracker.close()
+
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            "model_complexity": self.model_complexity,
+            "latency_budget_ms": self.latency_budget_ms,
+            "latency_ms": None if self.latency_ema_ms is None else round(self.latency_ema_ms, 1),
+            "frames": self.frames
+        }
+
+
+class PoseSessionManager:
+    """Keeps the live sessions of this worker and evicts idle ones."""
+
+    def __init__(self, max_sessions=MAX_SESSIONS, idle_timeout=SESSION_IDLE_TIMEOUT):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def create(self, owner, latency_budget_ms=None, model_complexity=None):
+        """Returns a new session, or None if the worker is at capacity."""
+        self.evict_idle()
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                return None
+        # Building the Mediapipe graph takes a while; don't block other sessions meanwhile
+        session = PoseSession(owner, latency_budget_ms, model_complexity)
+        with self._lock:
+            full = len(self._sessions) >= self.max_sessions
+            if not full:
+                self._sessions[session.session_id] = session
+        if full:
+            session.close()
+            return None
+        logging.info(f"Started pose session {session.session_id} for {owner}")
+        return session
+
+    def get(self, session_id, owner):
+        """Returns the session if it exists and belongs to owner."""
+        self.evict_idle()
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None or session.owner != owner:
+            return None
+        return session
+
+    def close(self, session_id, owner):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.owner != owner:
+                return False
+            del self._sessions[session_id]
+        session.close()
+        logging.info(f"Closed pose session {session_id}")
+        return True
+
+    def evict_idle(self):
+        now = time.monotonic()
+        with self._lock:
+            idle = [s for s in self._sessions.values() if now - s.last_used > self.idle_timeout]
+            for session in idle:
+                del self._sessions[session.session_id]
+        for session in idle:
+            logging.info(f"Evicting idle pose session {session.session_id}")
+            session.close()
+
+
+session_manager = PoseSessionManager()
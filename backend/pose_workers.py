@@ -0,0 +1,171 @@
+import atexit
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+
+import cv2
+import numpy as np
+
+from backend.pose_estimator import extract_landmarks
+
+# Number of Mediapipe worker processes (0 = extract inline on the request thread)
+POSE_WORKERS = int(os.getenv("POSE_WORKERS", "0"))
+
+# Largest decoded frame a shared-memory slot holds; bigger frames are downscaled
+# first (preprocess_frame resizes to 640x480 anyway)
+MAX_FRAME_HEIGHT = int(os.getenv("POSE_MAX_FRAME_HEIGHT", "1080"))
+MAX_FRAME_WIDTH = int(os.getenv("POSE_MAX_FRAME_WIDTH", "1920"))
+
+# ---- Worker process side ----
+_attached = {}
+
+
+def _init_worker():
+    """Runs once per worker: load Mediapipe and warm its graph on a blank frame."""
+    from backend import pose_estimator
+    pose_estimator.pose.get()
+
+
+def _extract_from_shm(slot_name, shape):
+    """Reads a frame from a shared-memory slot and returns its flat landmarks (or None)."""
+    shm = _attached.get(slot_name)
+    if shm is None:
+        shm = SharedMemory(name=slot_name)
+        _attached[slot_name] = shm
+
+    image = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    flat, _ = extract_landmarks(image)
+    del image
+    return flat
+
+
+# ---- Parent process side ----
+class PoseWorkerPool:
+    """
+    Pool of processes, each owning its own Mediapipe Pose instance.
+    Decoded frames are copied into shared-memory slots so only the slot
+    name and shape cross the process boundary. If a worker dies (crash,
+    OOM kill) the executor is replaced and the affected frames retried once;
+    the slots are kept.
+    """
+
+    def __init__(self, num_workers=None, max_frame_shape=(MAX_FRAME_HEIGHT, MAX_FRAME_WIDTH, 3)):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.max_frame_shape = max_frame_shape
+        slot_size = int(np.prod(max_frame_shape))
+        self.executor = self._new_executor()
+
+        # Two slots per worker keeps every worker busy while the next frame is copied in
+        self._slots = [SharedMemory(create=True, size=slot_size) for _ in range(self.num_workers * 2)]
+        self._free = queue.Queue()
+        for slot in self._slots:
+            self._free.put(slot)
+
+        logging.info(f"Started {self.num_workers} pose workers with {len(self._slots)} frame slots.")
+
+    def _new_executor(self):
+        # Spawn (not fork): the parent may already hold TensorFlow threads
+        return ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker
+        )
+
+    def _restart(self, broken):
+        """Replaces a broken executor, unless another thread already did."""
+        with _pool_lock:
+            if self.executor is broken:
+                logging.error("A pose worker died; restarting the pose worker pool.")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.executor = self._new_executor()
+
+    def _fit(self, image):
+        """Downscales frames that do not fit a slot."""
+        max_h, max_w, _ = self.max_frame_shape
+        h, w = image.shape[:2]
+        if h <= max_h and w <= max_w:
+            return image
+        scale = min(max_h / h, max_w / w)
+        return cv2.resize(image, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+    def submit(self, image, executor=None):
+        """Copies the frame into a free slot and queues it; returns a future of flat landmarks."""
+        executor = executor or self.executor
+        image = np.ascontiguousarray(self._fit(image), dtype=np.uint8)
+        slot = self._free.get()   # blocks when every slot is in flight (backpressure)
+        try:
+            view = np.ndarray(image.shape, dtype=np.uint8, buffer=slot.buf)
+            view[...] = image
+            del view
+            future = executor.submit(_extract_from_shm, slot.name, image.shape)
+        except Exception:
+            self._free.put(slot)
+            raise
+        # The slot is reusable as soon as the worker is done with it
+        future.add_done_callback(lambda _: self._free.put(slot))
+        return future
+
+    def extract(self, image):
+        """Same contract as extract_landmarks, run in a worker process."""
+        return self.extract_many([image])[0]
+
+    def extract_many(self, images):
+        """Extracts several frames in parallel across the workers, preserving order."""
+        executor = self.executor
+        try:
+            return self._extract_on(executor, images)
+        except BrokenProcessPool:
+            # Every pending future of a broken pool fails, which also frees their slots
+            self._restart(executor)
+            return self._extract_on(self.executor, images)
+
+    def _extract_on(self, executor, images):
+        futures = [self.submit(image, executor) for image in images]
+        return [self._to_result(future.result()) for future in futures]
+
+    @staticmethod
+    def _to_result(flat):
+        if flat is None:
+            return None, None
+        return flat, flat.reshape(-1, 4)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for slot in self._slots:
+            slot.close()
+            slot.unlink()
+        self._slots = []
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Starts the worker pool on first use (never at import, so spawned workers don't recurse)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PoseWorkerPool(POSE_WORKERS)
+                atexit.register(_pool.close)
+    return _pool
+
+
+def extract_frame_landmarks(image):
+    """extract_landmarks through the worker pool when POSE_WORKERS > 0, else inline."""
+    if POSE_WORKERS <= 0:
+        return extract_landmarks(image)
+    return get_pool().extract(image)
+
+
+def extract_frames_landmarks(images):
+    """Batch variant of extract_frame_landmarks; frames run concurrently on the pool."""
+    if POSE_WORKERS <= 0:
+        return [extract_landmarks(image) for image in images]
+    return get_pool().extract_many(images)
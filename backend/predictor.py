@@ -1,72 +1,227 @@
-import tensorflow as tf
 import numpy as np
 import json
 import logging
-from backend.utils import calculate_angle
-from backend.pose_feedback import (
-    get_tree_pose_feedback,   
-)
-
-model = tf.keras.models.load_model("backend/yoga_pose_model.h5")
-
-with open("backend/yoga_poses_classes.json") as f:
-    class_names = json.load(f)
-
-# Dispatch table for feedback functions
-POSE_FEEDBACK_MAP = {
-    "treepose": get_tree_pose_feedback,
-}
-
-def build_feature_vector(flat, landmarks):
-    """Hybrid vector: landmarks + angles (same as in training)"""
-    angles = []
-    try:
-        # Arms
-        angles.append(calculate_angle(landmarks[11], landmarks[13], landmarks[15]))
-        angles.append(calculate_angle(landmarks[12], landmarks[14], landmarks[16]))
-        # Legs
-        angles.append(calculate_angle(landmarks[23], landmarks[25], landmarks[27]))
-        angles.append(calculate_angle(landmarks[24], landmarks[26], landmarks[28]))
-        # Torso
-        angles.append(calculate_angle(landmarks[11], landmarks[23], landmarks[25]))
-        angles.append(calculate_angle(landmarks[12], landmarks[24], landmarks[26]))
-    except Exception as e:
-        logging.error(f"Error computing angles: {e}")
-        return np.array(flat)  # fallback if landmarks missing
-    
-    return np.concatenate([flat, np.array(angles, dtype=np.float32)])
+import os
+from backend.batcher import MicroBatcher
+from backend.numpy_model import NumpyPoseModel
+from backend import model_registry
+from backend.features import landmarks_to_array, build_features
+from backend.pose_feedback import rule_engine
+from backend.frame_cache import frame_cache
+from readiness import register, READY
+from telemetry import STAGE_LATENCY
 
+# Keras .h5, or a compact .npz export from compact.py (always served by NumPy)
+MODEL_PATH = os.getenv("POSE_MODEL_PATH", "backend/yoga_pose_model.h5")
+CLASSES_PATH = os.getenv("POSE_CLASSES_PATH", "backend/yoga_poses_classes.json")
+
+# Versioned model directory (see model_registry.py); when set it replaces the
+# fixed paths above and new versions are hot-reloaded without a restart
+MODEL_REGISTRY = os.getenv("POSE_MODEL_REGISTRY")
+
+# "keras" (TensorFlow), "numpy" (float32 NumPy forward pass) or "numpy_int8"
+INFERENCE_BACKEND = os.getenv("POSE_INFERENCE_BACKEND", "keras").lower()
+
+# Micro-batching: concurrent requests share one model call
+# (set POSE_BATCH_MAX_SIZE=1 to score every request on its own)
+BATCH_MAX_SIZE = int(os.getenv("POSE_BATCH_MAX_SIZE", "32"))
+BATCH_MAX_WAIT_MS = float(os.getenv("POSE_BATCH_MAX_WAIT_MS", "5"))
+
+
+def load_model(path=MODEL_PATH, backend=INFERENCE_BACKEND):
+    """Loads the classifier for the configured inference backend."""
+    if path.endswith(".npz"):
+        return NumpyPoseModel.from_npz(path)
+    if backend == "keras":
+        import tensorflow as tf   # only serving processes on the Keras backend pay for TF
+        return tf.keras.models.load_model(path)
+    if backend in ("numpy", "numpy_int8"):
+        return NumpyPoseModel.from_h5(path, quantize="int8" if backend == "numpy_int8" else None)
+    raise ValueError(f"Unknown POSE_INFERENCE_BACKEND: {backend}")
+
+
+class ModelBundle:
+    """
+    A model with its class map and version, swapped in and out as one unit.
+    Each bundle has its own micro-batcher, so a request that picked up a
+    bundle is scored and labelled by that bundle even if a newer one has
+    been swapped in meanwhile.
+    """
+
+    def __init__(self, version, model, class_names):
+        self.version = version
+        self.model = model
+        self.class_names = class_names
+        if BATCH_MAX_SIZE > 1:
+            self.batcher = MicroBatcher(self._score, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS)
+            self.classify = self.batcher.predict
+        else:
+            self.batcher = None
+            self.classify = self._score
+
+    def _score(self, batch):
+        return self.model.predict(batch, verbose=0)
+
+    def label(self, class_id):
+        return self.class_names[str(int(class_id))]
+
+    def close(self):
+        if self.batcher:
+            self.batcher.close()
+
+
+def load_bundle(version=None):
+    """The registry's version (default: CURRENT), or the fixed MODEL_PATH/CLASSES_PATH pair."""
+    if MODEL_REGISTRY:
+        version = version or model_registry.current_version(MODEL_REGISTRY)
+        if version is None:
+            raise FileNotFoundError(f"No current model version in {MODEL_REGISTRY}")
+        model_path, classes_path = model_registry.bundle_paths(MODEL_REGISTRY, version)
+    else:
+        model_path, classes_path = MODEL_PATH, CLASSES_PATH
+
+    model = load_model(model_path)
+    classes = getattr(model, "class_names", None)   # compact exports carry their own class map
+    if not classes:
+        with open(classes_path) as f:
+            classes = json.load(f)
+    return ModelBundle(version or "builtin", model, classes)
+
+
+def _warm_bundle(bundle):
+    """One dummy inference so the first real request doesn't pay for graph tracing."""
+    bundle.model.predict(np.zeros((1, bundle.model.input_shape[-1]), dtype=np.float32), verbose=0)
+
+
+# Loaded on first prediction or by the app's background warmup
+pose_model = register("pose_model", load_bundle, warmup=_warm_bundle)
+
+
+def reload_model(version=None):
+    """
+    Loads and warms a model version on the calling thread, then swaps it in.
+    Requests already holding the old bundle finish on it.
+    """
+    bundle = load_bundle(version)
+    _warm_bundle(bundle)
+    old = pose_model.replace(bundle)
+    if old is not None:
+        old.close()
+    logging.info(f"Serving pose model version {bundle.version}"
+                 + (f" (was {old.version})" if old is not None else ""))
+    return bundle
+
+
+_watcher = None
+
+
+def serving_version():
+    """Version of the bundle being served, or None until the first load has finished."""
+    return pose_model.get().version if pose_model.state == READY else None
+
+
+def start_model_watcher():
+    """Hot reload: follows the registry's CURRENT pointer from a background thread."""
+    global _watcher
+    if MODEL_REGISTRY and _watcher is None:
+        # Compared on every poll: CURRENT may move while the warmup is still loading the old version
+        _watcher = model_registry.RegistryWatcher(MODEL_REGISTRY, reload_model, serving_version=serving_version).start()
+    return _watcher
+
+
+# Dispatch table for hand-written feedback functions, for poses that
+# need more than the declarative rules in pose_rules.yaml
+POSE_FEEDBACK_MAP = {}
 
 def predict_pose(flat, landmarks, selected_pose, first_time=False):
     """
     flat: flattened Mediapipe landmarks (132 values)
-    landmarks: structured landmarks (for feedback)
+    landmarks: (33, 4) landmark array from extract_landmarks (for feedback)
     selected_pose: pose chosen by user in frontend
     first_time: whether to give intro guidance
     """
 
-    # 🛠️ Debug: log landmark info
-    if not landmarks:
-        logging.warning("⚠️ No landmarks passed into predict_pose.")
-    else:
-        logging.info(f"Received {len(landmarks)} landmarks for feedback.")
-        logging.debug(f"Nose coords: x={landmarks[0].x:.3f}, y={landmarks[0].y:.3f}")
-
     # ✅ Build hybrid feature vector (same as training)
-    feature_vector = build_feature_vector(flat, landmarks)
-    input_data = np.expand_dims(feature_vector, axis=0)
+    with STAGE_LATENCY.time("features"):
+        landmarks = landmarks_to_array(landmarks if landmarks is not None else flat)
+        input_data = build_features(landmarks[np.newaxis])
 
     # ✅ Model prediction
-    predictions = model.predict(input_data, verbose=0)
+    with STAGE_LATENCY.time("model"):
+        bundle = pose_model.get()
+        predictions = bundle.classify(input_data)
     class_id = int(np.argmax(predictions))
-    pose_class = class_names[str(class_id)]
-    logging.info(f"Predicted pose: {pose_class} (prob={predictions[0][class_id]:.2f})")
+    pose_class = bundle.label(class_id)
+    logging.debug(f"Predicted pose: {pose_class} (prob={predictions[0][class_id]:.2f})")
+
+    # ✅ Feedback based on the landmark array
+    with STAGE_LATENCY.time("feedback"):
+        feedback = get_feedback(selected_pose, pose_class, landmarks, first_time=first_time)
+
+    return pose_class, feedback
+
+
+def predict_pose_cached(cache_key, flat, landmarks, selected_pose):
+    """
+    predict_pose for a stream of frames from one user/session: while the user
+    holds still, the previous classification and feedback are reused.
+    """
+    landmarks = landmarks_to_array(landmarks if landmarks is not None else flat)
+    cached = frame_cache.lookup(cache_key, selected_pose, landmarks)
+    if cached is not None:
+        return cached
+
+    result = predict_pose(flat, landmarks, selected_pose)
+    frame_cache.store(cache_key, selected_pose, landmarks, result)
+    return result
+
+
+def get_feedback(selected_pose, pose_class, landmarks, first_time=False):
+    """Feedback for one frame of the selected pose."""
+    landmarks = landmarks_to_array(landmarks)[np.newaxis]
+    return get_feedback_batch(selected_pose, [pose_class], landmarks, first_time=first_time)[0]
+
+
+def get_feedback_batch(selected_pose, pose_classes, landmarks, first_time=False):
+    """
+    Feedback for N frames of the selected pose.
+    Declarative rules are evaluated for all frames in one pass; poses without
+    rules fall back to POSE_FEEDBACK_MAP.
+    """
+    if rule_engine.has_pose(selected_pose):
+        return rule_engine.feedback_batch(
+            [selected_pose] * len(pose_classes), pose_classes, landmarks, first_time=first_time
+        )
 
-    # ✅ Feedback based on structured landmarks
     feedback_fn = POSE_FEEDBACK_MAP.get(selected_pose.lower())
     if feedback_fn:
-        feedback = feedback_fn(pose_class, landmarks, first_time=first_time)
-    else:
-        feedback = [f"No feedback logic for {selected_pose}."]
+        return [feedback_fn(pose_class, lm, first_time=first_time)
+                for pose_class, lm in zip(pose_classes, landmarks)]
+    return [[f"No feedback logic for {selected_pose}."] for _ in pose_classes]
 
-    return pose_class, feedback
+
+def predict_poses(frames, selected_pose, first_time=False):
+    """
+    Batched variant of predict_pose for several frames of the same user.
+    frames: list of (flat, landmarks) pairs as returned by extract_landmarks
+    Returns a list of (pose_class, feedback) tuples in the same order.
+    """
+    if not frames:
+        return []
+
+    # ✅ One (N, 33, 4) array → one feature pass → one model call for the whole batch
+    with STAGE_LATENCY.time("features"):
+        batch = np.stack([
+            landmarks_to_array(landmarks if landmarks is not None else flat) for flat, landmarks in frames
+        ])
+        input_data = build_features(batch)
+    with STAGE_LATENCY.time("model"):
+        bundle = pose_model.get()
+        predictions = bundle.classify(input_data)
+    class_ids = np.argmax(predictions, axis=1)
+    logging.debug(f"Predicted {len(frames)} frames in one batch.")
+
+    pose_classes = [bundle.label(class_id) for class_id in class_ids]
+    with STAGE_LATENCY.time("feedback"):
+        feedback = get_feedback_batch(selected_pose, pose_classes, batch, first_time=first_time)
+    return list(zip(pose_classes, feedback))
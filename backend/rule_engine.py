@@ -0,0 +1,218 @@
+import logging
+import random
+
+import numpy as np
+import yaml
+
+from backend.features import NUM_LANDMARKS
+
+# Pair measurements between two points (see pose_rules.yaml)
+PAIR_KINDS = ("l1", "l2", "dx", "dy", "below", "above")
+
+
+class CompiledPose:
+    """Per-pose metadata; its checks live in the engine's shared tables."""
+
+    def __init__(self, name, spec, message_start, message_end):
+        self.name = name
+        self.expected_class = spec.get("expected_class")
+        self.mismatch = spec.get("mismatch", f"Please move into the {name}.")
+        self.intro = list(spec.get("intro", []))
+        self.praise = list(spec.get("praise", []))
+        self.message_start = message_start
+        self.message_end = message_end
+
+
+class PoseRuleEngine:
+    """
+    Compiles declarative pose rules into flat NumPy tables so every check of
+    every pose is evaluated for a whole (N, 33, 4) landmark batch at once.
+
+    Tables: points (landmark ids or midpoints) as a weight matrix over the 33
+    landmarks, pair measurements, angle measurements, conditions (reduce +
+    lt/gt thresholds over measurement columns) and a condition→message matrix.
+    """
+
+    def __init__(self, rules):
+        self.poses = {}
+        self._point_index = {}
+        self._point_weights = []
+        self._pairs = []          # (point_a, point_b, kind)
+        self._angles = []         # (point_a, vertex, point_c)
+        self._columns = []        # ("pair" | "angle", index) in condition order
+        self._cond_starts = []
+        self._cond_reduce_max = []
+        self._cond_lt = []
+        self._cond_gt = []
+        self._cond_message = []
+        self.messages = []
+
+        for name, spec in rules.items():
+            self._compile_pose(name.lower(), spec)
+        self._freeze()
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r") as file:
+            return cls(yaml.safe_load(file) or {})
+
+    # ---- Compilation ----
+    def _point(self, spec):
+        ids = tuple(sorted(spec)) if isinstance(spec, (list, tuple)) else (spec,)
+        if not ids or any(not isinstance(i, int) or not 0 <= i < NUM_LANDMARKS for i in ids):
+            raise ValueError(f"Invalid landmark point: {spec}")
+        if ids not in self._point_index:
+            weights = np.zeros(NUM_LANDMARKS)
+            weights[list(ids)] = 1.0 / len(ids)
+            self._point_index[ids] = len(self._point_weights)
+            self._point_weights.append(weights)
+        return self._point_index[ids]
+
+    def _add_pair(self, a, b, kind):
+        self._pairs.append((self._point(a), self._point(b), PAIR_KINDS.index(kind)))
+        self._columns.append(("pair", len(self._pairs) - 1))
+
+    def _add_angle(self, triple):
+        if len(triple) != 3:
+            raise ValueError(f"Angle needs [a, vertex, c], got {triple}")
+        self._angles.append(tuple(self._point(p) for p in triple))
+        self._columns.append(("angle", len(self._angles) - 1))
+
+    def _compile_condition(self, cond, message_id, where):
+        start = len(self._columns)
+        reduce = cond.get("reduce", "min")
+        if reduce not in ("min", "max"):
+            raise ValueError(f"{where}: reduce must be min or max")
+
+        lt, gt = cond.get("lt"), cond.get("gt")
+        if "distance" in cond:
+            metric = cond.get("metric", "l2")
+            if metric not in ("l1", "l2"):
+                raise ValueError(f"{where}: metric must be l1 or l2")
+            self._add_pair(*cond["distance"], metric)
+        elif "dx" in cond or "dy" in cond:
+            kind = "dx" if "dx" in cond else "dy"
+            self._add_pair(*cond[kind], kind)
+        elif "below" in cond or "above" in cond:
+            kind = "below" if "below" in cond else "above"
+            self._add_pair(*cond[kind], kind)
+            gt = 0.0 if gt is None and lt is None else gt
+        elif "angle" in cond:
+            self._add_angle(cond["angle"])
+        elif "angles" in cond:
+            for triple in cond["angles"]:
+                self._add_angle(triple)
+        else:
+            raise ValueError(f"{where}: unknown measurement in {cond}")
+
+        if lt is None and gt is None:
+            raise ValueError(f"{where}: condition needs lt or gt")
+        self._cond_starts.append(start)
+        self._cond_reduce_max.append(reduce == "max")
+        self._cond_lt.append(-np.inf if lt is None else float(lt))
+        self._cond_gt.append(np.inf if gt is None else float(gt))
+        self._cond_message.append(message_id)
+
+    def _compile_pose(self, name, spec):
+        message_start = len(self.messages)
+        for i, check in enumerate(spec.get("checks", [])):
+            message_id = len(self.messages)
+            self.messages.append(check["message"])
+            for cond in check.get("when", []):
+                self._compile_condition(cond, message_id, f"{name} check {i}")
+        self.poses[name] = CompiledPose(name, spec, message_start, len(self.messages))
+
+    def _freeze(self):
+        self._point_weights = np.array(self._point_weights).reshape(-1, NUM_LANDMARKS)
+        pairs = np.array(self._pairs, dtype=np.intp).reshape(-1, 3)
+        self._pair_a, self._pair_b, self._pair_kind = pairs[:, 0], pairs[:, 1], pairs[:, 2]
+        self._pair_columns = np.arange(len(pairs))
+        angles = np.array(self._angles, dtype=np.intp).reshape(-1, 3)
+        self._angle_a, self._angle_v, self._angle_c = angles[:, 0], angles[:, 1], angles[:, 2]
+
+        # Raw values are [pairs | angles]; reorder so each condition's columns are contiguous
+        offset = {"pair": 0, "angle": len(self._pairs)}
+        self._column_order = np.array([offset[kind] + i for kind, i in self._columns], dtype=np.intp)
+
+        self._cond_starts = np.array(self._cond_starts, dtype=np.intp)
+        self._cond_reduce_max = np.array(self._cond_reduce_max, dtype=bool)
+        self._cond_lt = np.array(self._cond_lt)
+        self._cond_gt = np.array(self._cond_gt)
+        self._membership = np.zeros((len(self._cond_message), len(self.messages)), dtype=np.int32)
+        self._membership[np.arange(len(self._cond_message)), self._cond_message] = 1
+
+    # ---- Evaluation ----
+    def evaluate(self, landmarks):
+        """
+        landmarks: (33, 4) or (N, 33, 4) array.
+        Returns an (N, num_messages) bool matrix: which correction fires per frame.
+        """
+        lm = np.asarray(landmarks, dtype=np.float64)
+        if lm.ndim == 2:
+            lm = lm[np.newaxis]
+        n = lm.shape[0]
+        if not len(self._cond_starts):
+            return np.zeros((n, len(self.messages)), dtype=bool)
+
+        coords = self._point_weights @ lm[..., :2]          # (N, points, 2)
+
+        d = coords[:, self._pair_a] - coords[:, self._pair_b]
+        dx, dy = d[..., 0], d[..., 1]
+        abs_x, abs_y = np.abs(dx), np.abs(dy)
+        # Every pair kind for every pair, then pick each pair's own kind
+        candidates = np.stack([abs_x + abs_y, np.sqrt(dx * dx + dy * dy), abs_x, abs_y, dy, -dy])
+        pair_values = candidates[self._pair_kind, :, self._pair_columns].T
+
+        ba = coords[:, self._angle_a] - coords[:, self._angle_v]
+        bc = coords[:, self._angle_c] - coords[:, self._angle_v]
+        norms = np.sqrt((ba * ba).sum(axis=-1)) * np.sqrt((bc * bc).sum(axis=-1))
+        cosine = (ba * bc).sum(axis=-1) / (norms + 1e-6)
+        angle_values = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+        values = np.concatenate([pair_values, angle_values], axis=1)[:, self._column_order]
+        reduced = np.where(
+            self._cond_reduce_max,
+            np.maximum.reduceat(values, self._cond_starts, axis=1),
+            np.minimum.reduceat(values, self._cond_starts, axis=1)
+        )
+        triggered = (reduced < self._cond_lt) | (reduced > self._cond_gt)
+        return (triggered.astype(np.int32) @ self._membership) > 0
+
+    def has_pose(self, pose_name):
+        return pose_name.lower() in self.poses
+
+    def _feedback_for(self, pose, pose_class, fired, first_time):
+        # 🎙️ Intro guidance
+        if first_time:
+            logging.debug(f"Giving {pose.name} introduction")
+            return list(pose.intro)
+
+        # 🧠 If pose not detected
+        if pose.expected_class and pose_class.lower() != pose.expected_class:
+            logging.debug(f"Pose mismatch: expected {pose.name}, got {pose_class}")
+            return [pose.mismatch]
+
+        feedback = [
+            self.messages[m]
+            for m in range(pose.message_start, pose.message_end) if fired[m]
+        ]
+
+        # ✅ If no corrections → encouragement
+        if not feedback and pose.praise:
+            feedback.append(random.choice(pose.praise))
+
+        logging.debug(f"{pose.name} feedback: {feedback}")
+        return feedback
+
+    def feedback(self, pose_name, pose_class, landmarks, first_time=False):
+        """Feedback messages for one frame, or None if there are no rules for pose_name."""
+        return self.feedback_batch([pose_name], [pose_class], landmarks, first_time)[0]
+
+    def feedback_batch(self, pose_names, pose_classes, landmarks, first_time=False):
+        """Feedback for N frames with one evaluation pass; None entries for unknown poses."""
+        fired = self.evaluate(landmarks)
+        results = []
+        for name, pose_class, frame_fired in zip(pose_names, pose_classes, fired):
+            pose = self.poses.get(name.lower())
+            results.append(None if pose is None else self._feedback_for(pose, pose_class, frame_fired, first_time))
+        return results
@@ -0,0 +1,211 @@
+# sweep.py
+# Hyperparameter sweep for the pose MLP: every configuration is scored with
+# stratified k-fold cross-validation, (configuration, fold) runs are spread over
+# a process pool, and the results are written as a leaderboard.
+#
+#   python sweep.py --trials 24 --folds 5 --out sweep_leaderboard.json
+#   python sweep.py --grid --workers 8
+#
+# Run from backend/ like train.py.
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+SEARCH_SPACE = {
+    "hidden_units": [(64,), (128,), (128, 64), (256, 128), (128, 64, 32)],
+    "dropout": [0.1, 0.2, 0.3],
+    "learning_rate": [3e-4, 1e-3, 3e-3],
+    "batch_size": [16, 32, 64],
+    "augment_copies": [0, 10],
+}
+MAX_EPOCHS = 200
+PATIENCE = 10                # epochs without val_loss improvement before stopping
+EARLY_STOP_SPLIT = 0.15      # part of each training fold held out for early stopping
+LATENCY_CALLS = 500          # single-frame predictions timed per trained model
+
+
+def grid_configs(space=SEARCH_SPACE):
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_configs(trials, seed=0, space=SEARCH_SPACE):
+    """`trials` distinct configurations sampled from the full grid."""
+    configs = grid_configs(space)
+    return random.Random(seed).sample(configs, min(trials, len(configs)))
+
+
+def config_name(config):
+    hidden = "x".join(str(units) for units in config["hidden_units"])
+    return (f"mlp{hidden}-do{config['dropout']}-lr{config['learning_rate']:g}"
+            f"-bs{config['batch_size']}-aug{config['augment_copies']}")
+
+
+# ---- Worker process side ----
+_data = {}
+
+
+def _init_worker(X, y, num_classes):
+    """One TensorFlow thread per worker: the pool provides the parallelism."""
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(1)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    _data.update(X=X, y=y, num_classes=num_classes)
+
+
+def single_frame_latency_ms(numpy_model, X, calls=LATENCY_CALLS):
+    """Median latency of one-frame predictions on the NumPy serving path."""
+    samples = X[np.arange(calls) % len(X)]
+    timings = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        numpy_model.predict(samples[i:i + 1])
+        timings[i] = time.perf_counter() - start
+    return float(np.median(timings) * 1000.0)
+
+
+def run_fold(task):
+    """Trains one configuration on one fold; returns that fold's scores."""
+    config_id, config, fold, train_idx, test_idx, seed = task
+    import tensorflow as tf
+    from sklearn.model_selection import train_test_split
+    from tensorflow.keras.callbacks import EarlyStopping
+    from tensorflow.keras.utils import to_categorical
+    from model_trainer import create_model
+    from augmentation import augment_features
+    from numpy_model import NumpyPoseModel
+
+    tf.keras.utils.set_random_seed(seed + fold)
+    X, y, num_classes = _data["X"], _data["y"], _data["num_classes"]
+    X_fit, X_stop, y_fit, y_stop = train_test_split(
+        X[train_idx], y[train_idx], test_size=EARLY_STOP_SPLIT, stratify=y[train_idx], random_state=seed + fold)
+    if config["augment_copies"]:
+        X_fit, y_fit = augment_features(X_fit, y_fit, copies=config["augment_copies"], rng=seed + fold)
+
+    model = create_model(X.shape[1], num_classes, config["hidden_units"], config["dropout"], config["learning_rate"])
+    start = time.perf_counter()
+    history = model.fit(
+        X_fit, to_categorical(y_fit, num_classes),
+        validation_data=(X_stop, to_categorical(y_stop, num_classes)),
+        epochs=MAX_EPOCHS,
+        batch_size=config["batch_size"],
+        callbacks=[EarlyStopping(monitor="val_loss", patience=PATIENCE, restore_best_weights=True)],
+        verbose=0,
+    )
+    train_time = time.perf_counter() - start
+
+    numpy_model = NumpyPoseModel.from_keras(model)
+    accuracy = float(np.mean(numpy_model.predict(X[test_idx]).argmax(axis=1) == y[test_idx]))
+    return {
+        "config_id": config_id,
+        "fold": fold,
+        "accuracy": accuracy,
+        "epochs": len(history.history["loss"]),
+        "train_time_s": train_time,
+        "latency_ms": single_frame_latency_ms(numpy_model, X[test_idx]),
+        "params": int(model.count_params()),
+    }
+
+
+# ---- Parent process side ----
+def leaderboard(configs, fold_results):
+    """One row per configuration, best mean accuracy first (ties: lower latency)."""
+    by_config = {}
+    for result in fold_results:
+        by_config.setdefault(result["config_id"], []).append(result)
+
+    rows = []
+    for config_id, results in by_config.items():
+        accuracy = np.array([r["accuracy"] for r in results])
+        rows.append({
+            "name": config_name(configs[config_id]),
+            "config": configs[config_id],
+            "folds": len(results),
+            "accuracy_mean": round(float(accuracy.mean()), 4),
+            "accuracy_std": round(float(accuracy.std()), 4),
+            "epochs_mean": round(float(np.mean([r["epochs"] for r in results])), 1),
+            "train_time_s": round(float(np.mean([r["train_time_s"] for r in results])), 2),
+            "latency_ms": round(float(np.median([r["latency_ms"] for r in results])), 4),
+            "params": results[0]["params"],
+        })
+    rows.sort(key=lambda row: (-row["accuracy_mean"], row["latency_ms"]))
+    for rank, row in enumerate(rows, 1):
+        row["rank"] = rank
+    return rows
+
+
+def run_sweep(X, y, num_classes, configs, folds=5, workers=None, seed=42):
+    """Cross-validates every configuration in configs; returns the leaderboard rows."""
+    from sklearn.model_selection import StratifiedKFold
+
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(X, y))
+    tasks = [(config_id, config, fold, train_idx, test_idx, seed)
+             for config_id, config in enumerate(configs)
+             for fold, (train_idx, test_idx) in enumerate(splits)]
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    # Spawn: a forked TensorFlow runtime is not safe to use in the child
+    context = mp.get_context("spawn")
+    results = []
+    start = time.perf_counter()
+    with context.Pool(min(workers, len(tasks)), initializer=_init_worker, initargs=(X, y, num_classes)) as pool:
+        for done, result in enumerate(pool.imap_unordered(run_fold, tasks), 1):
+            results.append(result)
+            elapsed = time.perf_counter() - start
+            eta = elapsed / done * (len(tasks) - done)
+            sys.stderr.write(f"\r[{done}/{len(tasks)}] fold runs, {elapsed:.0f}s elapsed, ETA {eta:.0f}s  ")
+            sys.stderr.flush()
+    sys.stderr.write("\n")
+    return leaderboard(configs, results)
+
+
+def print_leaderboard(rows, top=10):
+    print(f"\n{'rank':<5}{'configuration':<40}{'accuracy':>16}{'epochs':>8}{'train s':>9}{'latency ms':>12}")
+    for row in rows[:top]:
+        accuracy = f"{row['accuracy_mean']:.4f}±{row['accuracy_std']:.3f}"
+        print(f"{row['rank']:<5}{row['name']:<40}{accuracy:>16}{row['epochs_mean']:>8}"
+              f"{row['train_time_s']:>9.1f}{row['latency_ms']:>12.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter sweep for the pose model.")
+    parser.add_argument("--dataset", default="yoga_poses_dataset")
+    parser.add_argument("--grid", action="store_true", help="run the full grid instead of random trials")
+    parser.add_argument("--trials", type=int, default=20, help="random configurations to try")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None, help="training processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="sweep_leaderboard.json")
+    args = parser.parse_args(argv)
+
+    from dataset_processor import process_dataset
+
+    X, y, pose_dict = process_dataset(args.dataset)
+    if len(X) == 0:
+        print("No valid data was extracted from the dataset.")
+        return 1
+
+    configs = grid_configs() if args.grid else random_configs(args.trials, args.seed)
+    print(f"Sweeping {len(configs)} configurations x {args.folds} folds on {len(X)} samples.")
+    start = time.perf_counter()
+    rows = run_sweep(X, y, len(pose_dict), configs, args.folds, args.workers, args.seed)
+    wall_time = time.perf_counter() - start
+
+    print_leaderboard(rows)
+    print(f"Sweep finished in {wall_time:.0f}s.")
+    with open(args.out, "w") as f:
+        json.dump({"folds": args.folds, "samples": len(X), "wall_time_s": round(wall_time, 1),
+                   "leaderboard": rows}, f, indent=2)
+    print(f"Leaderboard written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,11 @@ from dataset_processor import process_dataset
 from model_trainer import train_yoga_model
 import matplotlib.pyplot as plt
 import json
+import os
+
+# Landmark augmentation is opt-in, so a plain run still reproduces the shipped model
+AUGMENT_COPIES = int(os.getenv("AUGMENT_COPIES", "0"))                 # variants per training sample
+AUGMENT_ASPECT_RATIO = float(os.getenv("AUGMENT_ASPECT_RATIO", "1.0"))  # width / height of the dataset images
 
 if __name__ == "__main__":
     dataset_path = "yoga_poses_dataset"  # Replace with your actual dataset path
@@ -21,7 +26,8 @@ if __name__ == "__main__":
         json.dump(inverse_pose_dict, f)
     
     print("Training model...")
-    model, history, _ = train_yoga_model(X, y, pose_dict)
+    model, history, _ = train_yoga_model(X, y, pose_dict, augment_copies=AUGMENT_COPIES,
+                                         augment_params={"aspect_ratio": AUGMENT_ASPECT_RATIO})
     
     print("Training complete!")
     
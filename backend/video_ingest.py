@@ -0,0 +1,94 @@
+# video_ingest.py
+# Frame sampling for long recordings: only the sampled frames are decoded
+# into images, and frames are handed out one at a time.
+import cv2
+import numpy as np
+
+DEFAULT_FPS = 30.0        # assumed when the container does not report one
+SEEK_MIN_STRIDE = 90      # sparser sampling seeks instead of grabbing every frame
+DEDUP_SIZE = (32, 24)     # thumbnail used to compare consecutive samples
+
+
+class VideoFrame:
+    __slots__ = ("index", "timestamp", "image")
+
+    def __init__(self, index, timestamp, image):
+        self.index = index
+        self.timestamp = timestamp    # seconds from the start of the video
+        self.image = image            # BGR
+
+
+def _thumbnail(image):
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, DEDUP_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def sample_frames(path, target_fps=None, every_n=None, start=0.0, end=None, dedup_threshold=None):
+    """
+    Yields VideoFrame samples from a video file, one at a time.
+
+    target_fps: sample rate in frames per second of video time (uses the
+        container's fps, so 30 and 60 fps recordings give the same rate)
+    every_n: alternatively, every n-th frame (default: every frame)
+    start, end: optional time window in seconds, [start, end)
+    dedup_threshold: skip a sample whose 32x24 grayscale thumbnail differs
+        from the last yielded one by less than this mean absolute level (0-255)
+
+    Skipped frames are only grabbed (demuxed/decoded without the conversion to
+    a BGR image); when samples are more than SEEK_MIN_STRIDE frames apart the
+    reader seeks straight to the next one instead.
+    """
+    if target_fps is not None and every_n is not None:
+        raise ValueError("Pass target_fps or every_n, not both")
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video: {path}")
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        step = fps / target_fps if target_fps else float(every_n or 1)
+        step = max(step, 1.0)
+        end_frame = end * fps if end is not None else None
+
+        next_sample = start * fps      # fractional frame position of the next sample
+        index = 0
+        last_thumb = None
+
+        while end_frame is None or next_sample < end_frame:
+            target = int(round(next_sample))
+            if target - index >= SEEK_MIN_STRIDE:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                index = target
+            # Advance to the target frame without converting the skipped ones
+            while index < target:
+                if not cap.grab():
+                    return
+                index += 1
+
+            ok, image = cap.read()
+            if not ok:
+                return
+            index += 1
+            next_sample += step
+
+            if dedup_threshold is not None:
+                thumb = _thumbnail(image)
+                if last_thumb is not None and np.abs(thumb - last_thumb).mean() < dedup_threshold:
+                    continue
+                last_thumb = thumb
+
+            yield VideoFrame(target, target / fps, image)
+    finally:
+        cap.release()
+
+
+def video_duration(path):
+    """Duration in seconds from the container metadata (0 if unknown)."""
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            raise IOError(f"Cannot open video: {path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        return max(cap.get(cv2.CAP_PROP_FRAME_COUNT), 0) / fps
+    finally:
+        cap.release()
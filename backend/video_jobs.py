@@ -0,0 +1,275 @@
+import json
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.video_ingest import sample_frames, video_duration
+
+JOB_DIR = os.getenv("VIDEO_JOB_DIR", "video_jobs")
+JOB_WORKERS = int(os.getenv("VIDEO_JOB_WORKERS", "0")) or os.cpu_count() or 1
+CHUNK_SECONDS = float(os.getenv("VIDEO_JOB_CHUNK_SECONDS", "30"))   # video time per worker task
+DEFAULT_SAMPLE_FPS = 2.0
+MAX_SAMPLE_FPS = 10.0
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+NO_POSE = "no_pose_detected"
+
+
+# ---- Worker process side ----
+def analyze_chunk(video_path, pose_name, sample_fps, start, end):
+    """
+    Landmarks for the sampled frames of [start, end) seconds, then one batched
+    classification + feedback pass. Returns {"started_at", "samples"} where
+    samples is [{"t", "pose", "feedback"}] and started_at is when this worker
+    picked the chunk up.
+    """
+    started_at = time.time()
+    from backend.pose_estimator import extract_landmarks
+    from backend.predictor import predict_poses
+
+    timestamps, frames = [], []
+    for frame in sample_frames(video_path, target_fps=sample_fps, start=start, end=end):
+        timestamps.append(frame.timestamp)
+        frames.append(extract_landmarks(frame.image))
+
+    detected = [i for i, (flat, _) in enumerate(frames) if flat is not None]
+    predictions = dict(zip(detected, predict_poses([frames[i] for i in detected], pose_name)))
+
+    samples = []
+    for i, t in enumerate(timestamps):
+        pose_class, feedback = predictions.get(i, (NO_POSE, []))
+        samples.append({"t": round(t, 3), "pose": pose_class, "feedback": feedback})
+    return {"started_at": started_at, "samples": samples}
+
+
+def build_timeline(samples, duration):
+    """
+    Per-second timeline (majority pose + its corrections), hold segments of
+    consecutive seconds in the same pose, and seconds per pose.
+    """
+    by_second = {}
+    for sample in samples:
+        by_second.setdefault(int(sample["t"]), []).append(sample)
+
+    timeline = []
+    for second in sorted(by_second):
+        second_samples = by_second[second]
+        pose, count = Counter(s["pose"] for s in second_samples).most_common(1)[0]
+        corrections = Counter(m for s in second_samples if s["pose"] == pose for m in s["feedback"])
+        timeline.append({
+            "second": second,
+            "pose": pose,
+            "confidence": round(count / len(second_samples), 2),
+            "corrections": [message for message, _ in corrections.most_common()]
+        })
+
+    holds = []
+    for entry in timeline:
+        last = holds[-1] if holds else None
+        if last and last["pose"] == entry["pose"] and last["end"] == entry["second"]:
+            last["end"] += 1
+        else:
+            holds.append({"pose": entry["pose"], "start": entry["second"], "end": entry["second"] + 1})
+    for hold in holds:
+        hold["duration_s"] = hold["end"] - hold["start"]
+
+    seconds_per_pose = Counter(entry["pose"] for entry in timeline)
+    longest = {}
+    for hold in holds:
+        if hold["pose"] != NO_POSE and hold["duration_s"] > longest.get(hold["pose"], 0):
+            longest[hold["pose"]] = hold["duration_s"]
+
+    return {
+        "duration_s": round(duration, 2),
+        "frames_analyzed": len(samples),
+        "seconds_per_pose": dict(seconds_per_pose),
+        "longest_hold_s": longest,
+        "holds": holds,
+        "timeline": timeline
+    }
+
+
+# ---- Parent process side ----
+class VideoJob:
+    def __init__(self, job_id, owner, pose_name, sample_fps, video_path, status=QUEUED,
+                 created_at=None, started_at=None, finished_at=None, error=None, chunks=0):
+        self.job_id = job_id
+        self.owner = owner
+        self.pose_name = pose_name
+        self.sample_fps = sample_fps
+        self.video_path = video_path
+        self.status = status
+        self.created_at = created_at or time.time()
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.error = error
+        self.chunks = chunks
+        self.chunks_done = 0
+        self.futures = []
+
+    def refresh(self):
+        """Marks a queued job RUNNING once the pool has dispatched one of its chunks."""
+        if self.status == QUEUED and any(future.running() or future.done() for future in self.futures):
+            self.status = RUNNING
+            self.started_at = time.time()
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "owner": self.owner,
+            "pose_name": self.pose_name,
+            "sample_fps": self.sample_fps,
+            "video_path": self.video_path,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "chunks": self.chunks,
+        }
+
+    def status_dict(self):
+        status = {k: v for k, v in self.to_dict().items() if k not in ("owner", "video_path")}
+        status["progress"] = round(self.chunks_done / self.chunks, 2) if self.chunks else 0.0
+        return status
+
+
+class VideoJobManager:
+    """
+    Runs uploaded-video analysis on a process pool. Each video is split into
+    CHUNK_SECONDS pieces so one long recording spreads over every worker.
+    Job metadata and results are JSON files under job_dir, so finished jobs
+    survive restarts; jobs that were still running are marked failed.
+    """
+
+    def __init__(self, job_dir=JOB_DIR, workers=JOB_WORKERS, chunk_seconds=CHUNK_SECONDS):
+        self.job_dir = job_dir
+        self.workers = workers
+        self.chunk_seconds = chunk_seconds
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        os.makedirs(job_dir, exist_ok=True)
+        self._load_jobs()
+
+    def _path(self, job_id, suffix):
+        return os.path.join(self.job_dir, f"{job_id}.{suffix}")
+
+    def _load_jobs(self):
+        for name in os.listdir(self.job_dir):
+            if not name.endswith(".job.json"):
+                continue
+            with open(os.path.join(self.job_dir, name)) as f:
+                job = VideoJob(**json.load(f))
+            if job.status in (QUEUED, RUNNING):
+                job.status, job.error = FAILED, "Interrupted by a server restart"
+                self._save(job)
+            self._jobs[job.job_id] = job
+
+    def _save(self, job):
+        tmp_path = self._path(job.job_id, "job.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(job.to_dict(), f)
+        os.replace(tmp_path, self._path(job.job_id, "job.json"))
+
+    def _get_executor(self):
+        # Started on first job (never at import, so spawned workers don't recurse)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context("spawn"))
+        return self._executor
+
+    def new_upload_path(self, extension=".mp4"):
+        """(job_id, path) to save an upload to before calling submit."""
+        job_id = uuid.uuid4().hex
+        return job_id, self._path(job_id, "video" + extension)
+
+    def submit(self, job_id, owner, video_path, pose_name, sample_fps=DEFAULT_SAMPLE_FPS):
+        duration = video_duration(video_path)   # raises IOError for unreadable uploads
+        chunk_starts = [i * self.chunk_seconds for i in range(max(1, int(-(-duration // self.chunk_seconds))))]
+
+        job = VideoJob(job_id, owner, pose_name, sample_fps, video_path, chunks=len(chunk_starts))
+        with self._lock:
+            self._jobs[job_id] = job
+            self._save(job)
+
+        executor = self._get_executor()
+        futures = job.futures
+        for start in chunk_starts:
+            # The last chunk is open-ended in case the container under-reports its length
+            end = start + self.chunk_seconds if start != chunk_starts[-1] else None
+            futures.append(executor.submit(analyze_chunk, video_path, pose_name, sample_fps, start, end))
+
+        def on_chunk_done(future):
+            with self._lock:
+                job.chunks_done += 1
+                finished = job.chunks_done == job.chunks
+                job.refresh()
+                # The worker's own start time replaces the time the dispatch was first noticed
+                if not future.cancelled() and future.exception() is None:
+                    job.started_at = min(job.started_at, future.result()["started_at"])
+            if finished:
+                self._finish(job, futures, duration)
+
+        for future in futures:
+            future.add_done_callback(on_chunk_done)
+        logging.info(f"Queued video job {job_id} ({duration:.0f}s, {len(futures)} chunks)")
+        return job
+
+    def _finish(self, job, futures, duration):
+        try:
+            samples = [sample for future in futures for sample in future.result()["samples"]]
+            result = build_timeline(samples, duration)
+            result.update({"job_id": job.job_id, "pose_name": job.pose_name, "sample_fps": job.sample_fps})
+            with open(self._path(job.job_id, "result.json"), "w") as f:
+                json.dump(result, f)
+            job.status = DONE
+        except Exception as e:
+            logging.error(f"Video job {job.job_id} failed: {e}")
+            job.status, job.error = FAILED, str(e)
+        job.finished_at = time.time()
+        with self._lock:
+            self._save(job)
+        # Only the timeline is kept; the upload itself is no longer needed
+        if os.path.exists(job.video_path):
+            os.remove(job.video_path)
+
+    def get(self, job_id, owner):
+        """The job if it exists and belongs to owner, else None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.refresh()
+        if job is None or job.owner != owner:
+            return None
+        return job
+
+    def result(self, job):
+        with open(self._path(job.job_id, "result.json")) as f:
+            return json.load(f)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """Creates the job manager (and loads finished jobs) on first use."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = VideoJobManager()
+    return _manager
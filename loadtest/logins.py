@@ -0,0 +1,150 @@
+"""
+Login throughput benchmark.
+
+Registers a set of users, then drives /login from concurrent clients for a
+fixed duration while a probe client times a cheap endpoint (/metrics), to
+show whether a login burst stalls the rest of the worker.
+
+    python -m loadtest.logins --clients 16 --duration 20
+    PASSWORD_HASH_WORKERS=0 python -m loadtest.logins          # hash inline, for comparison
+    PASSWORD_HASH_METHOD=scrypt:16384:8:1 python -m loadtest.logins
+    python -m loadtest.logins --url http://127.0.0.1:8000 --server-workers 4
+
+Run from the repository root.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from loadtest.run import start_local_server, wait_ready
+from loadtest.scenario import PASSWORD
+
+PERCENTILES = (50, 95, 99)
+
+
+def latency_summary(seconds):
+    if not seconds:
+        return {}
+    ms = np.array(seconds) * 1000.0
+    return {f"p{p}_ms": round(float(np.percentile(ms, p)), 2) for p in PERCENTILES}
+
+
+def register_users(base_url, count, run_id):
+    """Registers `count` users concurrently; returns their emails."""
+    emails = [f"login-bench-{run_id}-{i}@example.com" for i in range(count)]
+
+    def register(email):
+        r = requests.post(base_url + "/register", json={"email": email, "password": PASSWORD}, timeout=60)
+        if r.status_code not in (201, 409):
+            raise RuntimeError(f"register {email}: HTTP {r.status_code} {r.text}")
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(register, emails))
+    return emails
+
+
+def run_logins(base_url, emails, clients, duration, probe_interval=0.05):
+    deadline = time.monotonic() + duration
+    lock = threading.Lock()
+    logins, statuses, probes = [], {}, []
+
+    def client(index):
+        session = requests.Session()
+        i = index
+        while time.monotonic() < deadline:
+            email = emails[i % len(emails)]
+            i += clients
+            start = time.perf_counter()
+            try:
+                status = session.post(base_url + "/login", json={"email": email, "password": PASSWORD},
+                                      timeout=60).status_code
+            except requests.RequestException:
+                status = 0
+            elapsed = time.perf_counter() - start
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    logins.append(elapsed)
+
+    def probe():
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                session.get(base_url + "/metrics", timeout=60)
+                probes.append(time.perf_counter() - start)
+            except requests.RequestException:
+                pass
+            time.sleep(probe_interval)
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+    threads.append(threading.Thread(target=probe, daemon=True))
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.monotonic() - start, logins, statuses, probes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Logins/sec benchmark for the auth endpoints.")
+    parser.add_argument("--url", help="target a running server instead of booting app.py in-process")
+    parser.add_argument("--server-workers", type=int, default=1, help="server processes behind --url")
+    parser.add_argument("--users", type=int, default=32, help="accounts to register and log in as")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of login traffic")
+    parser.add_argument("--ready-timeout", type=float, default=180.0)
+    parser.add_argument("--out", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        server, base_url = start_local_server()
+    # Let model warmup finish so it doesn't compete with hashing for CPU
+    if not wait_ready(base_url, args.ready_timeout):
+        print(f"{base_url} did not become ready within {args.ready_timeout}s")
+        return 1
+
+    from user_interface.passwords import password_hasher
+    emails = register_users(base_url, args.users, run_id=int(time.time()))
+    elapsed, logins, statuses, probes = run_logins(base_url, emails, args.clients, args.duration)
+
+    rate = len(logins) / elapsed
+    report = {
+        "clients": args.clients,
+        "elapsed_s": round(elapsed, 2),
+        "logins": len(logins),
+        "logins_per_s": round(rate, 2),
+        "logins_per_s_per_worker": round(rate / args.server_workers, 2),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "login_latency": latency_summary(logins),
+        "probe_latency": latency_summary(probes),
+    }
+    if server:
+        # Only known for the in-process server
+        report["hash_method"] = password_hasher.method
+        report["hash_workers"] = password_hasher.workers
+
+    print(f"{report['logins']} logins in {report['elapsed_s']}s: {report['logins_per_s']} logins/s "
+          f"({report['logins_per_s_per_worker']} per server worker), statuses {report['statuses']}")
+    print(f"login latency {report['login_latency']}")
+    print(f"/metrics latency during the burst {report['probe_latency']}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if server:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+End-to-end HTTP load test.
+
+Boots app.py in-process on the in-memory document store (or targets a running
+server with --url), drives N scripted virtual users for a fixed duration and
+reports throughput and latency per endpoint.
+
+    python -m loadtest.run --users 16 --duration 60 --out loadtest.json
+    PRANA_DB_BACKEND=memory gunicorn -w 4 app:app &
+    python -m loadtest.run --url http://127.0.0.1:8000 --users 32
+
+Run from the repository root (model paths are relative to it).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+import requests
+
+from loadtest.scenario import DEFAULT_MIX, VirtualUser, load_images
+
+PERCENTILES = (50, 95, 99)
+
+
+class Recorder:
+    """Collects (status, latency) per action from every client thread."""
+
+    def __init__(self):
+        self._samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def __call__(self, action, status, seconds):
+        with self._lock:
+            self._samples[action].append((status, seconds))
+
+    def report(self, elapsed):
+        endpoints = {}
+        total = 0
+        for action, samples in sorted(self._samples.items()):
+            latencies_ms = np.array([s for _, s in samples]) * 1000.0
+            errors = sum(1 for status, _ in samples if status == 0 or status >= 500)
+            rejected = sum(1 for status, _ in samples if 400 <= status < 500)
+            endpoints[action] = {
+                "requests": len(samples),
+                "rps": round(len(samples) / elapsed, 2),
+                "errors": errors,
+                "client_errors": rejected,
+                **{f"p{p}_ms": round(float(np.percentile(latencies_ms, p)), 2) for p in PERCENTILES},
+                "mean_ms": round(float(latencies_ms.mean()), 2),
+            }
+            total += len(samples)
+        return {"elapsed_s": round(elapsed, 2), "requests": total,
+                "rps": round(total / elapsed, 2), "endpoints": endpoints}
+
+
+def start_local_server(port=0):
+    """Imports app.py on the in-memory store and serves it from a background thread."""
+    os.environ["PRANA_DB_BACKEND"] = "memory"
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)   # no access log line per request
+
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="loadtest-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def wait_ready(base_url, timeout):
+    """Waits for /ready so model loading is not counted as request latency."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(base_url + "/ready", timeout=5).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def parse_mix(spec):
+    """Parses action weights like predict_frame=60,chat_get=20; unnamed actions get 0."""
+    mix = {action: 0 for action in DEFAULT_MIX}
+    for part in spec.split(","):
+        action, _, weight = part.partition("=")
+        if action not in mix:
+            raise argparse.ArgumentTypeError(f"Unknown action {action}; choose from {', '.join(mix)}")
+        mix[action] = float(weight or 1)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mixed-traffic HTTP load test for the Prana Edge API.")
+    parser.add_argument("--url", help="target a running server instead of booting app.py in-process")
+    parser.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of traffic")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="action weights, e.g. predict_frame=60,chat_get=20")
+    parser.add_argument("--json-frames", action="store_true", help="send frames as base64 JSON instead of raw JPEG")
+    parser.add_argument("--ready-timeout", type=float, default=180.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        server, base_url = start_local_server()
+    if not wait_ready(base_url, args.ready_timeout):
+        print(f"{base_url} did not become ready within {args.ready_timeout}s")
+        return 1
+
+    images = load_images()
+    recorder = Recorder()
+    users = [VirtualUser(base_url, images, recorder, args.mix, args.json_frames, seed=args.seed + i)
+             for i in range(args.users)]
+
+    # Setup traffic (course creation) is not part of the measured mix
+    setup = VirtualUser(base_url, images, lambda *a: None)
+    setup.register()
+    setup.login()
+    setup.ensure_course()
+
+    print(f"Load testing {base_url} with {args.users} users for {args.duration:.0f}s")
+    start = time.monotonic()
+    deadline = start + args.duration
+    threads = [threading.Thread(target=user.run, args=(deadline,), daemon=True) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = recorder.report(time.monotonic() - start)
+    report["users"] = args.users
+
+    print(f"\n{'endpoint':<16}{'reqs':>7}{'rps':>9}{'err':>6}{'4xx':>6}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    for action, stats in report["endpoints"].items():
+        print(f"{action:<16}{stats['requests']:>7}{stats['rps']:>9.1f}{stats['errors']:>6}{stats['client_errors']:>6}"
+              f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}")
+    print(f"total: {report['requests']} requests, {report['rps']} req/s")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if server:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
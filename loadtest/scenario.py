@@ -0,0 +1,136 @@
+"""Scripted virtual users for the HTTP load test."""
+import base64
+import os
+import random
+import time
+import uuid
+
+import requests
+
+DATASET_DIR = "backend/yoga_poses_dataset"
+PASSWORD = "LoadTest@2024"
+COURSE_NAME = "loadtest-yoga"
+
+# Relative weight of each action in the traffic mix
+DEFAULT_MIX = {
+    "predict_frame": 40,
+    "chat_post": 10,
+    "chat_get": 10,
+    "join_leave": 10,
+    "nutrition": 8,
+    "health": 6,
+    "track_diet": 5,
+    "track_sleep": 5,
+    "login": 6,
+}
+
+
+def load_images(dataset_dir=DATASET_DIR, limit=50):
+    """Encoded dataset images to upload as frames."""
+    images = []
+    for root, _, files in sorted(os.walk(dataset_dir)):
+        for file in sorted(files):
+            if file.lower().endswith((".jpg", ".jpeg", ".png")):
+                with open(os.path.join(root, file), "rb") as f:
+                    images.append(f.read())
+                if len(images) >= limit:
+                    return images
+    return images
+
+
+class VirtualUser:
+    """One client: registers, logs in, then runs weighted random actions."""
+
+    def __init__(self, base_url, images, record, mix=None, json_frames=False, seed=None):
+        self.base_url = base_url.rstrip("/")
+        self.images = images
+        self.record = record          # record(action, status, seconds)
+        self.json_frames = json_frames
+        self.email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+        self.http = requests.Session()
+        self.token = None
+        self.rng = random.Random(seed)
+        mix = mix or DEFAULT_MIX
+        self.actions = list(mix)
+        self.weights = [mix[a] for a in self.actions]
+
+    def _call(self, action, method, path, **kwargs):
+        headers = kwargs.pop("headers", {})
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        start = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base_url + path, headers=headers, timeout=60, **kwargs)
+            status = response.status_code
+        except requests.RequestException:
+            response, status = None, 0
+        self.record(action, status, time.perf_counter() - start)
+        return response
+
+    # ---- Session setup ----
+    def register(self):
+        self._call("register", "POST", "/register", json={"email": self.email, "password": PASSWORD})
+
+    def login(self):
+        response = self._call("login", "POST", "/login", json={"email": self.email, "password": PASSWORD})
+        if response is not None and response.status_code == 200:
+            self.token = response.json()["access_token"]
+
+    def ensure_course(self):
+        self._call("create_course", "POST", "/courses", json={
+            "course_name": COURSE_NAME, "instructor": "Load Test", "level": "beginner"
+        })
+
+    # ---- Actions ----
+    def predict_frame(self):
+        image = self.rng.choice(self.images)
+        if self.json_frames:
+            data_url = "data:image/jpeg;base64," + base64.b64encode(image).decode()
+            self._call("predict_frame", "POST", "/predict_frame", json={"image": data_url, "pose_name": "treepose"})
+        else:
+            self._call("predict_frame", "POST", "/predict_frame", data=image,
+                       headers={"Content-Type": "image/jpeg", "X-Pose-Name": "treepose"})
+
+    def chat_post(self):
+        self._call("chat_post", "POST", f"/courses/{COURSE_NAME}/chat",
+                   json={"message": f"hello from {self.email}"})
+
+    def chat_get(self):
+        self._call("chat_get", "GET", f"/courses/{COURSE_NAME}/chat")
+
+    def join_leave(self):
+        self._call("course_join", "POST", f"/courses/{COURSE_NAME}/join")
+        self._call("course_leave", "DELETE", f"/courses/{COURSE_NAME}/leave")
+
+    def nutrition(self):
+        self._call("nutrition", "POST", "/api/nutrition_recommendation", json={
+            "height": self.rng.randint(150, 195), "weight": self.rng.randint(45, 110),
+            "age": self.rng.randint(18, 70), "gender": self.rng.choice(["male", "female"]),
+            "activity_level": self.rng.choice(["sedentary", "moderate", "active"]),
+            "diseases": self.rng.choice([[], ["diabetes"]])
+        })
+
+    def health(self):
+        self._call("health", "POST", "/api/health_status", json={
+            "height": self.rng.randint(150, 195), "weight": self.rng.randint(45, 110),
+            "age": self.rng.randint(18, 70), "gender": "female"
+        })
+
+    def track_diet(self):
+        self._call("track_diet", "POST", "/track_diet", json={
+            "meals": ["oats", "dal", "salad"], "water_intake": 2.5,
+            "calories": 1900, "protein": 70, "carbs": 230, "fats": 60
+        })
+
+    def track_sleep(self):
+        self._call("track_sleep", "POST", "/track_sleep", json={
+            "hours": self.rng.uniform(5, 9), "quality": self.rng.randint(1, 10),
+            "sleep_time": "23:00", "wake_time": "06:30", "interruptions": self.rng.randint(0, 3)
+        })
+
+    def run(self, deadline):
+        self.register()
+        self.login()
+        while time.monotonic() < deadline:
+            action = self.rng.choices(self.actions, self.weights)[0]
+            getattr(self, action)()
@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class LazyResource:
+    """
+    A heavy subsystem (model, Mediapipe graph, DB client, data tables) that is
+    built on first use or by the background warmup, whichever comes first.
+    """
+
+    def __init__(self, name, loader, warmup=None):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.state = PENDING
+        self.error = None
+        self.load_time = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self.state != READY:
+            with self._lock:
+                if self.state != READY:
+                    self._load()
+        return self._value
+
+    def _load(self):
+        self.state = LOADING
+        start = time.perf_counter()
+        try:
+            value = self.loader()
+            if self.warmup:
+                self.warmup(value)
+        except Exception as e:
+            self.state = FAILED
+            self.error = str(e)
+            logging.error(f"Failed to load {self.name}: {e}")
+            raise
+        self._value = value
+        self.error = None
+        self.load_time = time.perf_counter() - start
+        self.state = READY
+        logging.info(f"Loaded {self.name} in {self.load_time:.2f}s")
+
+    def replace(self, value):
+        """
+        Swaps in an already loaded (and warmed) value. Callers that fetched
+        the old value with get() keep using it until they are done.
+        """
+        with self._lock:
+            old, self._value = self._value, value
+            self.error = None
+            self.state = READY
+        return old
+
+    def status(self):
+        return {
+            "state": self.state,
+            "load_time_s": None if self.load_time is None else round(self.load_time, 3),
+            "error": self.error
+        }
+
+
+_resources = {}
+
+
+def register(name, loader, warmup=None):
+    resource = LazyResource(name, loader, warmup)
+    _resources[name] = resource
+    return resource
+
+
+def start_warmup(names=None):
+    """Loads the given (default: all) resources in a background thread."""
+    targets = [_resources[name] for name in (names or list(_resources))]
+
+    def run():
+        for resource in targets:
+            try:
+                resource.get()
+            except Exception:
+                pass  # already logged; get() retries on the next request
+
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def readiness():
+    """Returns (all_ready, {name: status})."""
+    statuses = {name: resource.status() for name, resource in _resources.items()}
+    return all(s["state"] == READY for s in statuses.values()), statuses
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from backend.augmentation import MIRROR_INDEX, augment_landmarks, augment_features, mirror
+from backend.features import FEATURE_DIM, build_features
+
+# Only the rotation: every other transform off
+ROTATION_ONLY = {"mirror_prob": 0.0, "max_rotation": 30.0, "scale_range": (1.0, 1.0),
+                 "max_shift": 0.0, "jitter": 0.0, "dropout_prob": 0.0}
+
+
+def landmarks(count=4, seed=0):
+    return np.random.default_rng(seed).random((count, 33, 4)).astype(np.float32)
+
+
+def pairwise_distances(lm, aspect_ratio):
+    """Distances between landmarks in square units (x scaled to the image height)."""
+    xy = lm[..., :2] * np.array([aspect_ratio, 1.0], dtype=np.float32)
+    return np.linalg.norm(xy[:, :, None] - xy[:, None, :], axis=-1)
+
+
+def test_mirror_twice_is_identity():
+    lm = landmarks()
+    np.testing.assert_allclose(mirror(mirror(lm)), lm, atol=1e-6)
+    assert sorted(MIRROR_INDEX) == list(range(33))
+    np.testing.assert_array_equal(MIRROR_INDEX[MIRROR_INDEX], np.arange(33))
+
+
+def test_mirror_swaps_mediapipe_left_and_right():
+    mp = pytest.importorskip("mediapipe")
+    names = {landmark.value: landmark.name for landmark in mp.solutions.pose.PoseLandmark}
+    for index, name in names.items():
+        if "LEFT" in name:
+            expected = name.replace("LEFT", "RIGHT")
+        elif "RIGHT" in name:
+            expected = name.replace("RIGHT", "LEFT")
+        else:
+            expected = name
+        assert names[int(MIRROR_INDEX[index])] == expected
+
+
+def test_mirror_flips_x_only():
+    lm = landmarks(1)[0]
+    flipped = mirror(lm)
+    np.testing.assert_allclose(flipped[:, 0], 1.0 - lm[MIRROR_INDEX, 0])
+    np.testing.assert_array_equal(flipped[:, 1:], lm[MIRROR_INDEX, 1:])
+
+
+@pytest.mark.parametrize("aspect_ratio", [1.0, 16 / 9, 3 / 4])
+def test_rotation_preserves_distances_in_square_units(aspect_ratio):
+    lm = landmarks()
+    out = augment_landmarks(lm, copies=8, rng=1, aspect_ratio=aspect_ratio, **ROTATION_ONLY)
+    original = pairwise_distances(np.repeat(lm, 8, axis=0), aspect_ratio)
+    np.testing.assert_allclose(pairwise_distances(out, aspect_ratio), original, atol=1e-5)
+    # ...and actually rotates
+    assert np.abs(out[..., :2] - np.repeat(lm, 8, axis=0)[..., :2]).max() > 0.01
+
+
+def test_rotation_without_aspect_correction_shears_non_square_images():
+    lm = landmarks()
+    out = augment_landmarks(lm, copies=8, rng=1, aspect_ratio=1.0, **ROTATION_ONLY)
+    original = pairwise_distances(np.repeat(lm, 8, axis=0), 16 / 9)
+    assert np.abs(pairwise_distances(out, 16 / 9) - original).max() > 0.01
+
+
+def test_per_sample_aspect_ratio():
+    lm = landmarks(2)
+    ratios = np.array([16 / 9, 3 / 4])
+    out = augment_landmarks(lm, copies=3, rng=2, aspect_ratio=ratios, **ROTATION_ONLY)
+    for i, ratio in enumerate(ratios):
+        rows = slice(i * 3, i * 3 + 3)
+        np.testing.assert_allclose(pairwise_distances(out[rows], ratio),
+                                   pairwise_distances(np.repeat(lm[i:i + 1], 3, axis=0), ratio), atol=1e-5)
+
+
+def test_augment_features_recomputes_angles():
+    lm = landmarks(3)
+    X, y = build_features(lm), np.array([0, 1, 2])
+    X_aug, y_aug = augment_features(X, y, copies=4, rng=0)
+    assert X_aug.shape == (3 + 12, FEATURE_DIM)
+    np.testing.assert_array_equal(y_aug, [0, 1, 2] + [0] * 4 + [1] * 4 + [2] * 4)
+    np.testing.assert_allclose(X_aug[3:], build_features(X_aug[3:, :132].reshape(-1, 33, 4)), rtol=1e-5)
+
+
+def test_unknown_parameter_is_rejected():
+    with pytest.raises(ValueError):
+        augment_landmarks(landmarks(), copies=1, rotation=5)
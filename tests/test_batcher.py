@@ -0,0 +1,43 @@
+import threading
+import time
+
+import numpy as np
+
+from backend.batcher import MicroBatcher
+
+
+def slow_scores(rows):
+    time.sleep(0.05)
+    return rows * 2.0
+
+
+def test_close_with_rows_in_flight_stops_worker():
+    batcher = MicroBatcher(slow_scores, max_batch_size=4, max_wait_ms=1)
+    results = []
+
+    def client(i):
+        results.append(batcher.predict(np.full((3, 2), i, dtype=np.float32)))
+
+    clients = [threading.Thread(target=client, args=(i,)) for i in range(8)]
+    for thread in clients:
+        thread.start()
+    time.sleep(0.01)
+    batcher.close()
+    # Requests arriving after close() are scored inline, not by a new worker
+    late = batcher.predict(np.ones((2, 2), dtype=np.float32))
+    for thread in clients:
+        thread.join(timeout=5)
+
+    worker = batcher._worker
+    worker.join(timeout=5)
+    assert not worker.is_alive()
+    assert len(results) == 8
+    assert all(r.shape == (3, 2) for r in results)
+    np.testing.assert_array_equal(late, np.full((2, 2), 2.0))
+
+
+def test_predict_after_close_never_starts_a_worker():
+    batcher = MicroBatcher(slow_scores)
+    batcher.close()
+    np.testing.assert_array_equal(batcher.predict(np.ones(2, dtype=np.float32)), [[2.0, 2.0]])
+    assert batcher._worker is None
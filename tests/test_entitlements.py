@@ -0,0 +1,127 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from user_interface import entitlements
+from user_interface.entitlements import (
+    EntitlementCache, ALLOWED, NOT_FOUND, TRIAL_EXPIRED, TRIAL_INFO_MISSING,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(entitlements.time, "monotonic", clock)
+    return clock
+
+
+class Users:
+    """Loader standing in for users_collection.find_one; counts the lookups."""
+
+    def __init__(self, **users):
+        self.users = users
+        self.loads = 0
+
+    def __call__(self, email):
+        self.loads += 1
+        return self.users.get(email)
+
+
+def user(is_premium=False, age=timedelta(hours=1)):
+    return {"is_premium": is_premium, "created_at": datetime.utcnow() - age}
+
+
+def test_check_outcomes():
+    assert entitlements.Entitlement.from_user(None).check() == NOT_FOUND
+    assert entitlements.Entitlement.from_user(user()).check() == ALLOWED
+    assert entitlements.Entitlement.from_user(user(age=timedelta(days=2))).check() == TRIAL_EXPIRED
+    assert entitlements.Entitlement.from_user(user(True, age=timedelta(days=2))).check() == ALLOWED
+    assert entitlements.Entitlement.from_user({"is_premium": False}).check() == TRIAL_INFO_MISSING
+
+
+def test_entries_expire_after_ttl(clock):
+    users = Users(**{"a@example.com": user()})
+    cache = EntitlementCache(ttl=60, loader=users)
+
+    assert cache.get("a@example.com").check() == ALLOWED
+    clock.now += 59
+    users.users["a@example.com"] = user(age=timedelta(days=2))   # trial ended in the database
+    assert cache.get("a@example.com").check() == ALLOWED         # still cached
+    assert users.loads == 1
+
+    clock.now += 2
+    assert cache.get("a@example.com").check() == TRIAL_EXPIRED
+    assert users.loads == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_users_are_evicted(clock):
+    users = Users(**{f"{name}@example.com": user() for name in "abc"})
+    cache = EntitlementCache(ttl=60, max_users=2, loader=users)
+    cache.get("a@example.com")
+    cache.get("b@example.com")
+    cache.get("a@example.com")
+    cache.get("c@example.com")
+    assert len(cache) == 2
+
+    loads = users.loads
+    cache.get("a@example.com")
+    assert users.loads == loads
+    cache.get("b@example.com")
+    assert users.loads == loads + 1
+
+
+def test_invalidate_drops_the_entry(clock):
+    users = Users(**{"a@example.com": user()})
+    cache = EntitlementCache(ttl=60, loader=users)
+    cache.get("a@example.com")
+    users.users["a@example.com"] = user(True)
+    cache.invalidate("a@example.com")
+    assert cache.get("a@example.com").is_premium
+    assert users.loads == 2
+
+
+def test_invalidate_during_a_load_does_not_store_the_stale_value(clock):
+    cache = EntitlementCache(ttl=60)
+    loading, invalidated = threading.Event(), threading.Event()
+    stale, fresh = user(age=timedelta(days=2)), user(True, age=timedelta(days=2))
+    rows = [stale, fresh]
+
+    def slow_loader(email):
+        row = rows.pop(0)
+        if row is stale:
+            loading.set()
+            invalidated.wait(5)   # the upgrade lands while this read is in flight
+        return row
+
+    cache.loader = slow_loader
+    results = []
+    reader = threading.Thread(target=lambda: results.append(cache.get("a@example.com")))
+    reader.start()
+    assert loading.wait(5)
+    cache.invalidate("a@example.com")
+    invalidated.set()
+    reader.join(5)
+
+    # The in-flight caller still sees what it read, but it is not cached
+    assert results[0].check() == TRIAL_EXPIRED
+    assert len(cache) == 0
+    assert cache.get("a@example.com").check() == ALLOWED
+    assert len(cache) == 1
+
+
+def test_zero_ttl_disables_caching(clock):
+    users = Users(**{"a@example.com": user()})
+    cache = EntitlementCache(ttl=0, loader=users)
+    cache.get("a@example.com")
+    cache.get("a@example.com")
+    assert users.loads == 2 and len(cache) == 0
@@ -0,0 +1,85 @@
+import json
+import os
+
+import numpy as np
+
+from backend.feature_store import FeatureStore, SHARD_SIZE, INDEX_FILE, config_digest
+from backend.features import build_features
+
+CONFIG = {"mediapipe": "0.10.14", "pose_options": {"model_complexity": 1}, "video_sampling": [6.0, 2.0]}
+
+
+def write(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+
+def samples(seed, count):
+    return np.random.default_rng(seed).random((count, 33, 4)).astype(np.float32)
+
+
+def test_keys_are_content_addressed(tmp_path):
+    store = FeatureStore(str(tmp_path / "store"), CONFIG)
+    a = write(tmp_path / "a.jpg", b"same bytes")
+    b = write(tmp_path / "b.jpg", b"same bytes")
+    c = write(tmp_path / "c.jpg", b"other bytes")
+    assert store.key_for(a) == store.key_for(b)
+    assert store.key_for(a) != store.key_for(c)
+
+    # Rewriting a file (new size and mtime) changes its key
+    before = store.key_for(a)
+    write(tmp_path / "a.jpg", b"edited bytes, longer")
+    assert store.key_for(a) != before
+
+
+def test_config_digest_follows_extractor_settings(tmp_path):
+    assert config_digest(CONFIG) == config_digest(dict(reversed(list(CONFIG.items()))))
+    changed = {**CONFIG, "pose_options": {"model_complexity": 2}}
+    assert config_digest(changed) != config_digest(CONFIG)
+    assert config_digest({**CONFIG, "mediapipe": "0.10.21"}) != config_digest(CONFIG)
+
+    image = write(tmp_path / "a.jpg", b"bytes")
+    old = FeatureStore(str(tmp_path / "store"), CONFIG)
+    new = FeatureStore(str(tmp_path / "store"), changed)
+    assert old.key_for(image) != new.key_for(image)
+
+
+def test_flushes_a_shard_every_shard_size_files(tmp_path):
+    root = str(tmp_path / "store")
+    store = FeatureStore(root, CONFIG)
+    for i in range(SHARD_SIZE - 1):
+        store.put(f"key-{i}", samples(i, i % 3))   # every third file has no pose
+    assert not os.path.exists(os.path.join(root, INDEX_FILE))
+
+    store.put(f"key-{SHARD_SIZE - 1}", samples(SHARD_SIZE - 1, 1))
+    assert os.path.exists(os.path.join(root, "shard-00000.landmarks.npy"))
+    with open(os.path.join(root, INDEX_FILE)) as f:
+        assert len(json.load(f)["entries"]) == SHARD_SIZE
+
+    store.put("pending", samples(999, 2))
+    assert not os.path.exists(os.path.join(root, "shard-00001.landmarks.npy"))
+    # Not flushed: a new process doesn't see it
+    assert FeatureStore(root, CONFIG).get("pending") is None
+
+
+def test_round_trip_through_index(tmp_path):
+    root = str(tmp_path / "store")
+    store = FeatureStore(root, CONFIG, shard_size=2)
+    image = write(tmp_path / "a.jpg", b"image bytes")
+    key = store.key_for(image)
+    stored = {key: samples(1, 2), "empty": samples(2, 0), "video": samples(3, 5)}
+    for k, value in stored.items():
+        store.put(k, value)
+    store.close()
+
+    reopened = FeatureStore(root, CONFIG, shard_size=2)
+    assert reopened.key_for(image) == key
+    for k, value in stored.items():
+        assert k in reopened
+        landmarks, features = reopened.get(k)
+        np.testing.assert_array_equal(landmarks, value)
+        assert features.shape == (len(value), 138)
+        if len(value):
+            np.testing.assert_allclose(features, build_features(value), rtol=1e-6)
+            assert isinstance(landmarks, np.memmap) or isinstance(landmarks.base, np.memmap)
+    assert reopened.get("missing") is None
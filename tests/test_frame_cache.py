@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from backend import frame_cache as frame_cache_module
+from backend.frame_cache import FrameDeltaCache
+
+RESULT = ("tree_pose", ["Great balance, hold your pose."])
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(frame_cache_module.time, "monotonic", clock)
+    return clock
+
+
+def landmarks(offset=0.0):
+    lm = np.random.default_rng(0).random((33, 4)).astype(np.float32)
+    lm[:, :2] += offset
+    return lm
+
+
+def make_cache(**kwargs):
+    return FrameDeltaCache(**{"threshold": 0.01, "max_sessions": 8, "idle_timeout": 60, "max_age": 2, **kwargs})
+
+
+def test_hit_when_movement_is_under_threshold(clock):
+    cache = make_cache()
+    cache.store("user", "treepose", landmarks(), RESULT)
+    clock.now += 0.5
+    assert cache.lookup("user", "treepose", landmarks(0.009)) is RESULT
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_miss_when_movement_is_over_threshold(clock):
+    cache = make_cache()
+    cache.store("user", "treepose", landmarks(), RESULT)
+    assert cache.lookup("user", "treepose", landmarks(0.02)) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_drift_is_measured_from_the_computed_frame(clock):
+    cache = make_cache()
+    cache.store("user", "treepose", landmarks(), RESULT)
+    assert cache.lookup("user", "treepose", landmarks(0.006)) is RESULT
+    # Small steps add up: 0.012 from the computed frame, though only 0.006 from the last one
+    assert cache.lookup("user", "treepose", landmarks(0.012)) is None
+
+
+def test_miss_after_max_age(clock):
+    cache = make_cache()
+    cache.store("user", "treepose", landmarks(), RESULT)
+    clock.now += 1.9
+    assert cache.lookup("user", "treepose", landmarks()) is RESULT
+    # Hits don't refresh computed_at
+    clock.now += 0.2
+    assert cache.lookup("user", "treepose", landmarks()) is None
+
+
+def test_miss_when_pose_changes(clock):
+    cache = make_cache()
+    cache.store("user", "treepose", landmarks(), RESULT)
+    assert cache.lookup("user", "warrior", landmarks()) is None
+    assert cache.lookup("other-user", "treepose", landmarks()) is None
+    assert cache.lookup("user", "treepose", landmarks()) is RESULT
+
+
+def test_lru_eviction_at_capacity(clock):
+    cache = make_cache(max_sessions=2)
+    cache.store("a", "treepose", landmarks(), RESULT)
+    cache.store("b", "treepose", landmarks(), RESULT)
+    assert cache.lookup("a", "treepose", landmarks()) is RESULT    # "a" is now most recent
+    cache.store("c", "treepose", landmarks(), RESULT)
+
+    assert cache.lookup("b", "treepose", landmarks()) is None
+    assert cache.lookup("a", "treepose", landmarks()) is RESULT
+    assert cache.lookup("c", "treepose", landmarks()) is RESULT
+    assert len(cache._entries) == 2
+
+
+def test_idle_sessions_are_evicted(clock):
+    cache = make_cache(max_age=1000)
+    cache.store("idle", "treepose", landmarks(), RESULT)
+    clock.now += 30
+    cache.store("active", "treepose", landmarks(), RESULT)
+    clock.now += 31
+    assert cache.lookup("active", "treepose", landmarks()) is RESULT
+    assert "idle" not in cache._entries
+
+
+def test_disabled_cache_never_stores(clock):
+    cache = make_cache(threshold=0)
+    cache.store("user", "treepose", landmarks(), RESULT)
+    assert cache.lookup("user", "treepose", landmarks()) is None
+    assert not cache._entries
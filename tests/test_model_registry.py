@@ -0,0 +1,86 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from backend import model_registry, predictor
+from backend.numpy_model import NumpyPoseModel
+from readiness import LazyResource
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..", "backend")
+
+
+@pytest.fixture(scope="module")
+def model_files(tmp_path_factory):
+    """A compact .npz export of the bundled model and its class map."""
+    directory = tmp_path_factory.mktemp("model")
+    with open(os.path.join(BACKEND_DIR, "yoga_poses_classes.json")) as f:
+        classes = json.load(f)
+    classes_path = directory / "classes.json"
+    classes_path.write_text(json.dumps(classes))
+    model_path = directory / "model.npz"
+    NumpyPoseModel.from_h5(os.path.join(BACKEND_DIR, "yoga_pose_model.h5")).save_npz(str(model_path), "float32", classes)
+    return str(model_path), str(classes_path)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """A fresh registry wired into the predictor, with its own pose_model resource."""
+    root = str(tmp_path / "models")
+    resource = LazyResource("pose_model", predictor.load_bundle, warmup=predictor._warm_bundle)
+    monkeypatch.setattr(predictor, "MODEL_REGISTRY", root)
+    monkeypatch.setattr(predictor, "pose_model", resource)
+    monkeypatch.setattr(predictor, "_watcher", None)
+    yield root
+    if predictor._watcher is not None:
+        predictor._watcher.stop()
+    if resource._value is not None:
+        resource._value.close()
+
+
+def test_publish_activate_and_list(registry, model_files):
+    model_path, classes_path = model_files
+    assert model_registry.current_version(registry) is None
+
+    model_registry.publish(registry, model_path, classes_path, version="v1")
+    model_registry.publish(registry, model_path, classes_path, version="v2", make_current=False)
+    assert model_registry.list_versions(registry) == ["v1", "v2"]
+    assert model_registry.current_version(registry) == "v1"
+
+    model_registry.activate(registry, "v2")
+    assert model_registry.current_version(registry) == "v2"
+    assert model_registry.bundle_paths(registry, "v2")[0].endswith("model.npz")
+
+    with pytest.raises(FileExistsError):
+        model_registry.publish(registry, model_path, classes_path, version="v1")
+    with pytest.raises(FileNotFoundError):
+        model_registry.activate(registry, "missing")
+    assert model_registry.current_version(registry) == "v2"
+
+
+def test_watcher_reloads_when_current_moves_during_warmup(registry, model_files):
+    model_path, classes_path = model_files
+    model_registry.publish(registry, model_path, classes_path, version="v1")
+
+    # Warmup reads CURRENT (v1) and is still loading when v2 is activated and the watcher starts
+    loading = predictor.load_bundle()
+    model_registry.publish(registry, model_path, classes_path, version="v2")
+    watcher = predictor.start_model_watcher()
+    watcher.stop()
+    assert not watcher.check()              # nothing served yet: skip the poll
+
+    predictor.pose_model.replace(loading)
+    assert predictor.serving_version() == "v1"
+    assert watcher.check()
+    assert predictor.pose_model.get().version == "v2"
+    assert loading.batcher is None or loading.batcher._closed
+
+    scores = predictor.pose_model.get().classify(np.zeros((1, 138), dtype=np.float32))
+    assert scores.shape == (1, len(predictor.pose_model.get().class_names))
+    assert not watcher.check()              # up to date
+
+    # Rollback
+    model_registry.activate(registry, "v1")
+    assert watcher.check()
+    assert predictor.serving_version() == "v1"
@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+from backend.numpy_model import check_parity, parity_ok, FLOAT32_ATOL, INT8_MIN_AGREEMENT
+
+pytest.importorskip("tensorflow")
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "backend", "yoga_pose_model.h5")
+
+
+def test_float32_matches_keras():
+    max_diff, agreement = check_parity(MODEL_PATH, samples=2000, seed=1)
+    assert max_diff <= FLOAT32_ATOL
+    assert agreement == 1.0
+
+
+def test_int8_agrees_with_keras_on_the_class():
+    max_diff, agreement = check_parity(MODEL_PATH, samples=2000, quantize="int8", seed=1)
+    assert agreement >= INT8_MIN_AGREEMENT
+    assert parity_ok(max_diff, agreement, "int8")
@@ -0,0 +1,34 @@
+import threading
+
+from werkzeug.security import check_password_hash
+
+from user_interface.passwords import PasswordHasher
+
+METHOD = "pbkdf2:sha256:1000"
+
+
+def test_rehash_is_skipped_when_the_pool_is_saturated():
+    hasher = PasswordHasher(METHOD, workers=1, max_pending=1, queue_timeout=0.1)
+    hashed = []
+    done = threading.Event()
+
+    def on_hashed(new_hash):
+        hashed.append(new_hash)
+        done.set()
+
+    assert hasher._slots.acquire(blocking=False)      # a login holds the only pending slot
+    assert hasher.rehash_later("secret", on_hashed) is False
+    hasher._slots.release()
+
+    assert hasher.rehash_later("secret", on_hashed) is True
+    assert done.wait(5)
+    assert check_password_hash(hashed[0], "secret")
+    assert not hasher.needs_rehash(hashed[0])
+
+
+def test_rehash_releases_its_slot():
+    hasher = PasswordHasher(METHOD, workers=1, max_pending=1, queue_timeout=0.1)
+    for on_hashed in (lambda _: None, lambda _: 1 / 0):      # also when on_hashed raises
+        assert hasher.rehash_later("secret", on_hashed)
+        assert hasher._slots.acquire(timeout=5)
+        hasher._slots.release()
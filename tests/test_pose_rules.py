@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+from backend import predictor
+from backend.features import joint_angles
+from backend.pose_feedback import rule_engine
+
+INTRO = [
+    "Stand tall with feet together.",
+    "Lift one foot and place it on the inner thigh of your opposite leg.",
+    "Raise your arms overhead and bring your palms together in prayer position.",
+    "Keep your body straight and balanced.",
+]
+PRAISE = [
+    "Nice work, you are steady in tree pose.",
+    "Great balance, hold your pose.",
+    "Perfect alignment, keep breathing calmly.",
+]
+PALMS = "Bring your palms together in prayer position."
+ARMS = "Raise your arms straight above your head."
+STANDING_LEG = "Keep your standing leg straight."
+LIFT_FOOT = "Lift one foot and place it on your thigh."
+HIPS = "Balance your hips and keep them level."
+UPRIGHT = "Keep your body upright and avoid leaning sideways."
+
+
+def legacy_tree_pose_feedback(pose_class, lm, first_time=False):
+    """The hand-written checks pose_rules.yaml replaced; praise is returned as a marker."""
+    if first_time:
+        return list(INTRO)
+    if pose_class.lower() != "tree_pose":
+        return ["Please move into the tree pose."]
+
+    feedback = []
+    x, y = lm[:, 0], lm[:, 1]
+    left_arm_angle, right_arm_angle, left_leg_angle, right_leg_angle = joint_angles(lm)[:4]
+    if abs(x[15] - x[16]) + abs(y[15] - y[16]) > 0.08:
+        feedback.append(PALMS)
+    if y[15] > y[0] or y[16] > y[0] or left_arm_angle < 150 or right_arm_angle < 150:
+        feedback.append(ARMS)
+    if min(left_leg_angle, right_leg_angle) < 160:
+        feedback.append(STANDING_LEG)
+    if abs(y[27] - y[28]) < 0.07:
+        feedback.append(LIFT_FOOT)
+    if abs(y[23] - y[24]) > 0.12:
+        feedback.append(HIPS)
+    if abs(x[0] - (x[23] + x[24]) / 2) > 0.1:
+        feedback.append(UPRIGHT)
+    return feedback or ["<praise>"]
+
+
+def tree_pose():
+    """Landmarks that pass every tree pose check: arms straight up, palms together, both legs straight."""
+    lm = np.full((33, 4), 0.5, dtype=np.float32)
+    lm[:, 3] = 1.0
+    points = {
+        0: (0.50, 0.20),                                   # nose
+        11: (0.45, 0.30), 13: (0.46, 0.18), 15: (0.48, 0.06),  # left arm
+        12: (0.55, 0.30), 14: (0.54, 0.18), 16: (0.52, 0.06),  # right arm
+        23: (0.47, 0.55), 25: (0.47, 0.70), 27: (0.47, 0.85),  # left (standing) leg
+        24: (0.53, 0.55), 26: (0.60, 0.65), 28: (0.67, 0.75),  # right leg, lifted sideways
+    }
+    for index, (x, y) in points.items():
+        lm[index, :2] = (x, y)
+    return lm
+
+
+def moved(**points):
+    lm = tree_pose()
+    for name, xy in points.items():
+        lm[int(name[1:]), :2] = xy
+    return lm
+
+
+# (landmarks, message that must fire) for each condition of each check
+FAILING = [
+    (moved(p15=(0.40, 0.06)), PALMS),
+    (moved(p15=(0.48, 0.25)), ARMS),                       # left wrist below the nose
+    (moved(p16=(0.52, 0.25)), ARMS),                       # right wrist below the nose
+    (moved(p13=(0.36, 0.18)), ARMS),                       # left elbow bent
+    (moved(p14=(0.64, 0.18)), ARMS),                       # right elbow bent
+    (moved(p25=(0.58, 0.70)), STANDING_LEG),
+    (moved(p26=(0.53, 0.70), p28=(0.53, 0.85)), LIFT_FOOT),
+    (moved(p24=(0.53, 0.70), p26=(0.60, 0.80), p28=(0.67, 0.90)), HIPS),
+    (moved(p0=(0.65, 0.20)), UPRIGHT),
+]
+
+
+def engine_feedback(pose_classes, landmarks, first_time=False):
+    return rule_engine.feedback_batch(["treepose"] * len(pose_classes), pose_classes, landmarks, first_time)
+
+
+def normalize(messages):
+    return ["<praise>"] if len(messages) == 1 and messages[0] in PRAISE else messages
+
+
+def test_passing_pose_gets_praise():
+    assert legacy_tree_pose_feedback("tree_pose", tree_pose()) == ["<praise>"]
+    [feedback] = engine_feedback(["tree_pose"], tree_pose()[np.newaxis])
+    assert len(feedback) == 1 and feedback[0] in PRAISE
+
+
+@pytest.mark.parametrize("landmarks, message", FAILING)
+def test_each_check_fires_like_the_old_code(landmarks, message):
+    expected = legacy_tree_pose_feedback("tree_pose", landmarks)
+    [feedback] = engine_feedback(["tree_pose"], landmarks[np.newaxis])
+    assert message in expected
+    assert feedback == expected
+
+
+def test_batch_matches_old_checks_on_perturbed_poses():
+    rng = np.random.default_rng(0)
+    batch = np.stack([tree_pose()] * 300 + [landmarks for landmarks, _ in FAILING])
+    batch[:300, :, :2] += rng.normal(0.0, 0.04, (300, 33, 2)).astype(np.float32)
+    classes = ["tree_pose"] * len(batch)
+
+    results = engine_feedback(classes, batch)
+    assert [normalize(feedback) for feedback in results] == \
+           [legacy_tree_pose_feedback(c, lm) for c, lm in zip(classes, batch)]
+
+
+def test_first_time_and_class_mismatch():
+    batch = np.stack([tree_pose(), FAILING[0][0]])
+    assert engine_feedback(["tree_pose", "warrior"], batch, first_time=True) == [INTRO, INTRO]
+    assert engine_feedback(["warrior", "Tree_Pose"], batch)[0] == legacy_tree_pose_feedback("warrior", batch[0])
+    assert engine_feedback(["warrior", "Tree_Pose"], batch)[1] == legacy_tree_pose_feedback("Tree_Pose", batch[1])
+
+
+def test_pose_without_rules_falls_back_to_feedback_map(monkeypatch):
+    calls = []
+
+    def warrior_feedback(pose_class, landmarks, first_time=False):
+        calls.append((pose_class, landmarks.shape, first_time))
+        return [f"warrior: {pose_class}"]
+
+    monkeypatch.setitem(predictor.POSE_FEEDBACK_MAP, "warrior", warrior_feedback)
+    batch = np.stack([tree_pose(), tree_pose()])
+    assert not rule_engine.has_pose("Warrior")
+    assert predictor.get_feedback_batch("Warrior", ["a", "b"], batch, first_time=True) == \
+           [["warrior: a"], ["warrior: b"]]
+    assert calls == [("a", (33, 4), True), ("b", (33, 4), True)]
+    assert predictor.get_feedback_batch("lotus", ["a"], batch[:1]) == [["No feedback logic for lotus."]]
@@ -0,0 +1,51 @@
+import os
+import signal
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")
+
+from backend.pose_workers import PoseWorkerPool
+
+IMAGE_PATH = os.path.join(os.path.dirname(__file__), "..", "backend", "yoga_poses_dataset", "tree_pose", "00000071.jpg")
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = PoseWorkerPool(num_workers=2)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="module")
+def image():
+    return cv2.imread(IMAGE_PATH)
+
+
+def kill_workers(pool):
+    for pid in list(pool.executor._processes):
+        os.kill(pid, signal.SIGKILL)
+
+
+def test_extract_survives_a_killed_worker(pool, image):
+    flat, _ = pool.extract(image)
+    assert flat is not None
+    broken = pool.executor
+
+    kill_workers(pool)
+    retried, landmarks = pool.extract(image)
+
+    assert pool.executor is not broken
+    np.testing.assert_allclose(retried, flat, atol=1e-5)
+    assert landmarks.shape == (33, 4)
+
+
+def test_extract_many_survives_a_killed_worker(pool, image):
+    kill_workers(pool)
+    results = pool.extract_many([image] * 5)
+    assert len(results) == 5
+    assert all(flat is not None for flat, _ in results)
+    # Every slot went back to the free list
+    assert pool._free.qsize() == len(pool._slots)
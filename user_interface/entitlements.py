@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from .database import users_collection
+
+TRIAL_PERIOD = timedelta(days=1)
+CACHE_TTL = float(os.getenv("ENTITLEMENT_CACHE_TTL", "60"))              # seconds
+CACHE_MAX_USERS = int(os.getenv("ENTITLEMENT_CACHE_MAX_USERS", "10000"))
+
+# Outcomes of Entitlement.check
+ALLOWED = "allowed"
+NOT_FOUND = "not_found"
+TRIAL_INFO_MISSING = "trial_info_missing"
+TRIAL_EXPIRED = "trial_expired"
+
+
+class Entitlement:
+    """What a user may use: premium flag and when the free trial ends."""
+    __slots__ = ("exists", "is_premium", "trial_expires_at")
+
+    def __init__(self, exists, is_premium=False, trial_expires_at=None):
+        self.exists = exists
+        self.is_premium = is_premium
+        self.trial_expires_at = trial_expires_at    # naive UTC datetime, None if unknown
+
+    @classmethod
+    def from_user(cls, user):
+        if not user:
+            return cls(False)
+        created_at = user.get("created_at")
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        return cls(True, bool(user.get("is_premium", False)),
+                   created_at + TRIAL_PERIOD if created_at else None)
+
+    def check(self, now=None):
+        """ALLOWED or the reason access is denied. Trial expiry is evaluated at call time."""
+        if not self.exists:
+            return NOT_FOUND
+        if self.is_premium:
+            return ALLOWED
+        if self.trial_expires_at is None:
+            return TRIAL_INFO_MISSING
+        if (now or datetime.utcnow()) > self.trial_expires_at:
+            return TRIAL_EXPIRED
+        return ALLOWED
+
+
+# ---- Per-user cache ----
+class EntitlementCache:
+    """
+    Bounded TTL cache of Entitlement per email in front of users_collection.
+    Least recently used users are evicted past max_users; entries older than
+    ttl seconds are reloaded, so an upgrade, downgrade or deleted account is
+    seen by every process within ttl. invalidate(email) drops the entry in
+    this process right away.
+    """
+
+    def __init__(self, ttl=CACHE_TTL, max_users=CACHE_MAX_USERS, loader=None):
+        self.ttl = ttl
+        self.max_users = max_users
+        self.loader = loader or (lambda email: users_collection.find_one(
+            {"email": email}, {"is_premium": 1, "created_at": 1}))
+        self._entries = OrderedDict()   # email -> (Entitlement, loaded_at)
+        self._lock = threading.Lock()
+        self._generation = 0            # bumped by invalidate()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, email):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(email)
+            if cached is not None and now - cached[1] < self.ttl:
+                self._entries.move_to_end(email)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+            generation = self._generation
+
+        # Loaded outside the lock so one slow query doesn't stall every user
+        entitlement = Entitlement.from_user(self.loader(email))
+        if self.ttl > 0 and self.max_users > 0:
+            with self._lock:
+                if generation != self._generation:
+                    return entitlement    # invalidated while loading: may already be stale
+                self._entries[email] = (entitlement, now)
+                self._entries.move_to_end(email)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+        return entitlement
+
+    def invalidate(self, email):
+        with self._lock:
+            self._entries.pop(email, None)
+            self._generation += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+entitlement_cache = EntitlementCache()
+
+
+def invalidate(email):
+    """Drops the cached entitlement of one user (after an upgrade, downgrade or deletion)."""
+    entitlement_cache.invalidate(email)
@@ -0,0 +1,220 @@
+"""
+In-memory stand-in for the pymongo client, for load tests and offline runs
+(PRANA_DB_BACKEND=memory). Implements the subset of the collection API the
+app uses: insert_one, find_one, find (+ sort/limit), count_documents,
+update_one/update_many ($set, $unset, $inc), delete_one/delete_many and
+create_index (unique indexes raise DuplicateKeyError like the server does).
+Filters support equality and $in/$nin/$ne/$gt/$gte/$lt/$lte/$exists.
+Data lives for the life of the process and is not shared between workers.
+"""
+import copy
+import threading
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from pymongo.results import DeleteResult, InsertOneResult, UpdateResult
+
+_MISSING = object()
+
+_COMPARATORS = {
+    "$ne": lambda value, arg: value != arg,
+    "$gt": lambda value, arg: value is not _MISSING and value > arg,
+    "$gte": lambda value, arg: value is not _MISSING and value >= arg,
+    "$lt": lambda value, arg: value is not _MISSING and value < arg,
+    "$lte": lambda value, arg: value is not _MISSING and value <= arg,
+    "$in": lambda value, arg: value in arg,
+    "$nin": lambda value, arg: value not in arg,
+    "$exists": lambda value, arg: (value is not _MISSING) == bool(arg),
+}
+
+
+def _matches(document, query):
+    for field, condition in (query or {}).items():
+        value = document.get(field, _MISSING)
+        if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            for op, arg in condition.items():
+                if op not in _COMPARATORS:
+                    raise NotImplementedError(f"Unsupported query operator {op}")
+                if not _COMPARATORS[op](value, arg):
+                    return False
+        elif value is _MISSING or value != condition:
+            if not (value is _MISSING and condition is None):
+                return False
+    return True
+
+
+def _apply_update(document, update):
+    for op, fields in update.items():
+        if op == "$set":
+            document.update(fields)
+        elif op == "$unset":
+            for field in fields:
+                document.pop(field, None)
+        elif op == "$inc":
+            for field, amount in fields.items():
+                document[field] = document.get(field, 0) + amount
+        else:
+            raise NotImplementedError(f"Unsupported update operator {op}")
+
+
+class MemoryCursor:
+    def __init__(self, documents):
+        self._documents = documents
+        self._limit = 0
+
+    def sort(self, key, direction=1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, order in reversed(keys):
+            self._documents.sort(key=lambda d: (d.get(field) is None, d.get(field)), reverse=order < 0)
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def __iter__(self):
+        documents = self._documents[:self._limit] if self._limit else self._documents
+        return (copy.deepcopy(d) for d in documents)
+
+
+class MemoryCollection:
+    def __init__(self, name):
+        self.name = name
+        self._documents = {}          # _id -> document, in insertion order
+        self._unique = {}             # index name -> (fields, {key values: _id})
+        self._lock = threading.RLock()
+
+    def create_index(self, keys, unique=False, name=None, **kwargs):
+        fields = tuple(k for k, _ in keys) if isinstance(keys, list) else (keys,)
+        name = name or "_".join(f"{field}_1" for field in fields)
+        if unique:
+            with self._lock:
+                if name in self._unique:
+                    return name
+                entries = {}
+                for document in self._documents.values():
+                    key = tuple(document.get(field) for field in fields)
+                    if key in entries:
+                        raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}")
+                    entries[key] = document["_id"]
+                self._unique[name] = (fields, entries)
+        return name
+
+    def _check_unique(self, document, ignore_id=None):
+        for name, (fields, entries) in self._unique.items():
+            owner = entries.get(tuple(document.get(field) for field in fields), ignore_id)
+            if owner != ignore_id:
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}")
+
+    def _index(self, document, add):
+        for fields, entries in self._unique.values():
+            key = tuple(document.get(field) for field in fields)
+            if add:
+                entries[key] = document["_id"]
+            else:
+                entries.pop(key, None)
+
+    def insert_one(self, document):
+        with self._lock:
+            if "_id" not in document:
+                document["_id"] = ObjectId()
+            if document["_id"] in self._documents:
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: _id_")
+            self._check_unique(document)
+            self._documents[document["_id"]] = copy.deepcopy(document)
+            self._index(document, add=True)
+        return InsertOneResult(document["_id"], acknowledged=True)
+
+    def _find(self, query):
+        return [d for d in self._documents.values() if _matches(d, query)]
+
+    def find_one(self, query=None, *args, **kwargs):
+        with self._lock:
+            for document in self._documents.values():
+                if _matches(document, query):
+                    return copy.deepcopy(document)
+        return None
+
+    def find(self, query=None, *args, **kwargs):
+        with self._lock:
+            return MemoryCursor(self._find(query))
+
+    def count_documents(self, query, **kwargs):
+        with self._lock:
+            return len(self._find(query))
+
+    def _update(self, query, update, many):
+        with self._lock:
+            matched = self._find(query)
+            if not many:
+                matched = matched[:1]
+            for document in matched:
+                updated = copy.deepcopy(document)
+                _apply_update(updated, update)
+                self._check_unique(updated, ignore_id=document["_id"])
+                self._index(document, add=False)
+                self._documents[document["_id"]] = updated
+                self._index(updated, add=True)
+        raw = {"n": len(matched), "nModified": len(matched), "ok": 1.0}
+        return UpdateResult(raw, acknowledged=True)
+
+    def update_one(self, query, update, **kwargs):
+        return self._update(query, update, many=False)
+
+    def update_many(self, query, update, **kwargs):
+        return self._update(query, update, many=True)
+
+    def _delete(self, query, many):
+        with self._lock:
+            matched = self._find(query)
+            if not many:
+                matched = matched[:1]
+            for document in matched:
+                del self._documents[document["_id"]]
+                self._index(document, add=False)
+        return DeleteResult({"n": len(matched), "ok": 1.0}, acknowledged=True)
+
+    def delete_one(self, query, **kwargs):
+        return self._delete(query, many=False)
+
+    def delete_many(self, query, **kwargs):
+        return self._delete(query, many=True)
+
+
+class MemoryDatabase:
+    def __init__(self, name):
+        self.name = name
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = MemoryCollection(name)
+            return self._collections[name]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def command(self, name, *args, **kwargs):
+        return {"ok": 1.0}
+
+
+class MemoryClient:
+    """Drop-in for MongoClient(uri) as far as get_db() and the ping are concerned."""
+
+    def __init__(self, *args, **kwargs):
+        self._databases = {}
+        self._lock = threading.Lock()
+        self.admin = MemoryDatabase("admin")
+
+    def __getitem__(self, name):
+        with self._lock:
+            if name not in self._databases:
+                self._databases[name] = MemoryDatabase(name)
+            return self._databases[name]
+
+    def close(self):
+        pass
@@ -0,0 +1,93 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Werkzeug method string; the cost is part of it, e.g. "scrypt:16384:8:1" or
+# "pbkdf2:sha256:600000". Existing hashes keep verifying after a change and
+# are rehashed with the new cost on the user's next login.
+HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+
+# hashlib's scrypt/pbkdf2 release the GIL, so the pool hashes in parallel
+# while request threads only wait; 0 hashes inline on the request thread
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+# Requests allowed to wait for a hashing thread before new ones are refused
+MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(max(HASH_WORKERS, 1) * 8)))
+QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "2"))   # seconds
+
+
+class HashPoolBusy(Exception):
+    """Too many password hashes in flight; the request should be retried later."""
+
+
+class PasswordHasher:
+    """
+    Bounded pool for password hashing and verification. At most `workers`
+    hashes run at once and at most `max_pending` requests wait, so a burst
+    of logins uses a fixed share of the CPU instead of every request thread.
+    """
+
+    def __init__(self, method=HASH_METHOD, workers=HASH_WORKERS, max_pending=MAX_PENDING,
+                 queue_timeout=QUEUE_TIMEOUT):
+        self.method = method
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="password-hash") if workers > 0 else None
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._prefix = None
+
+    def _run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HashPoolBusy("Password hashing pool is saturated")
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True if the hash was made with another method or cost than the configured one."""
+        if self._prefix is None:
+            # Full parameter string, also when HASH_METHOD is just "scrypt" or "pbkdf2"
+            self._prefix = generate_password_hash("", self.method).split("$", 1)[0] + "$"
+        return not password_hash.startswith(self._prefix)
+
+    def rehash_later(self, password, on_hashed):
+        """
+        Hashes with the current method in the background and passes the result
+        to on_hashed. Takes a pending slot like any other hash; when the pool
+        is saturated the rehash is skipped (returns False) and retried on a
+        later login.
+        """
+        def run():
+            try:
+                on_hashed(generate_password_hash(password, self.method))
+            except Exception as e:
+                logging.error(f"Password rehash failed: {e}")
+            finally:
+                self._slots.release()
+
+        if not self._slots.acquire(blocking=False):
+            logging.debug("Password hashing pool is saturated, skipping a rehash")
+            return False
+        if self._executor is None:
+            run()
+            return True
+        try:
+            self._executor.submit(run)
+        except Exception:
+            self._slots.release()
+            raise
+        return True
+
+
+password_hasher = PasswordHasher()